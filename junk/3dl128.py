@@ -2,46 +2,121 @@
 """
 logs_128.py
 
-3D multi-log viewer (up to 128 files). Shows panels in a grid and allows:
+3D multi-log viewer (up to 4096 files). Shows panels in a grid and allows:
  - WASD movement + mouse look (FPS)
  - Arrow keys to move focus between panels
  - Smooth camera movement to focused panel
  - Zoom in/out with +/- or mouse wheel
+ - PageUp/PageDown to page through the focused file's full history, on
+   into its rotated copies (app.log.1, app.log.2.gz, ...)
+ - / to search every panel's lines in memory, n for the next hit
+ - H to focus the busiest file, F4 to tint cards by ingest rate
+ - F3 ingest stats, F5 per-task frame timings, F6 record/write a Chrome trace
+ - F7 (with --parse json|logfmt|auto): per-panel counts by level, top status
+   codes and latency percentiles over a sliding window
+ - --watch-dir/--glob: panels appear and retire as files come and go
+ - --session: pick up where the last run left off (history, offsets, view)
+ - --serve/--subscribe: one headless tail daemon per host, any number of viewers
+
+Files are tailed from one inotify-driven thread on Linux; elsewhere it falls
+back to one polling thread per file. --engine processes moves tailing,
+decoding and filtering into worker processes. --engine asyncio runs every source
+(files, commands, Unix sockets, named pipes) on one asyncio loop instead.
 
 Usage:
   python3 logs_128.py --file /path/to/log1 --file /path/to/log2 ...
+  python3 logs_128.py --engine asyncio --file /var/log/app.log --cmd 'journal=journalctl -f'
+  python3 logs_128.py --glob '/var/log/containers/*.log'
+  python3 logs_128.py --session ~/.cache/3dl.session --file /var/log/app.log ...
+  python3 logs_128.py --serve /tmp/3dl.sock --file /var/log/app.log ...   # headless
+  python3 logs_128.py --subscribe /tmp/3dl.sock --backfill 200
 
 Dependencies:
   - panda3d (pip install panda3d)
+  - optional: numpy, for --parse
+  - optional: zstandard, to read rotated .zst logs
   - Debian: fonts /usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf (used by default)
 """
 
 from __future__ import annotations
 import argparse
+import array
+from bisect import bisect_left, bisect_right
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import heapq
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+import mmap
+import multiprocessing
+import multiprocessing.connection
 import os
+import re
+import resource
+import select
+import shlex
+import socket
+import stat
+import struct
 import time
 import threading
-import queue
+import zlib
 from collections import deque
-from math import sin, cos, radians
-from typing import Callable, Dict, List, Tuple
+from itertools import accumulate
+from fnmatch import fnmatch
+from math import sin, cos, radians, ceil, exp, log1p, nan
+from typing import Callable, Dict, Iterator, List, Tuple
+
+try:
+    import zstandard  # optional: rotated .zst logs are skipped without it
+except ImportError:
+    zstandard = None
+try:
+    import numpy as np  # optional: needed by --parse (field aggregates)
+except ImportError:
+    np = None
 
 # Panda3D imports
 from direct.showbase.ShowBase import ShowBase
 from direct.task import Task
+from direct.gui.OnscreenText import OnscreenText
+from direct.gui.DirectEntry import DirectEntry
 from panda3d.core import (
     TextNode, FontPool, CardMaker, Point3, Vec3,
-    WindowProperties, LVector2i, ClockObject
+    WindowProperties, GraphicsWindow, LVector2i, ClockObject, BoundingBox, NodePath,
+    PNMTextMaker, PNMImage, Filename, Texture, TextureStage, TransparencyAttrib,
+    TextProperties, TextPropertiesManager
 )
 
 # ----------------------------
 # Config
 # ----------------------------
-MAX_FILES = 128
-PANEL_MAX_LINES = 200
+MAX_FILES = 4096
+ROW_LEN = 128         # panels per grid row; more files start further rows below
+PANEL_MAX_LINES = 200  # lines shown in a panel
+SCROLLBACK_BYTES = 256 * 1024  # UTF-8 history kept per panel (LineRing budget)
+INDEX_BLOCK = 1 << 20  # scrollback: newline counts are indexed per block of this many bytes
+BACKFILL_BLOCK = 64 * 1024  # --backfill reads files backwards in blocks of this size
+BACKFILL_WORKERS = 32
+BACKFILL_DECODE_MAX = 64 << 20  # --backfill: most bytes decoded from one compressed rotated copy
+ARCHIVE_WINDOW = 1 << 20      # rotated archives are decoded in windows of this many bytes
+ARCHIVE_SEEK_SPAN = 4 << 20   # .gz: decoder snapshot every this many decoded bytes
+ARCHIVE_CACHE_WINDOWS = 4     # decoded windows kept per archive
+HIGHLIGHT_COLOR = (0.3, 0.85, 1.0, 1)  # for --highlight patterns
+# severity keywords highlighted by default: (name, regex, color)
+DEFAULT_HIGHLIGHTS = (
+    ("error", r"\b(?:ERROR|ERR|FATAL|CRIT(?:ICAL)?|PANIC)\b", (1.0, 0.35, 0.3, 1)),
+    ("warn", r"\b(?:WARN(?:ING)?)\b", (1.0, 0.8, 0.2, 1)),
+)
 PANEL_WIDTH = 8.0
 PANEL_HEIGHT = 27
 PANEL_SPACING = 8.5   # spacing between panels on grid
+ROW_SPACING = PANEL_HEIGHT + 3.0  # vertical spacing between grid rows
+VIRTUAL_RADIUS = 12   # live panels: this many slots either side of the camera
+VIRTUAL_HYSTERESIS = 4  # extra slots before a live panel is released again
 PANEL_SCALE = 1.0     # base scale then adjusted by text scale
 START_CAMERA_DIST = 0.0
 FOCUS_DIST = 6.5      # distance from panel when focusing/zoom=1.0
@@ -49,51 +124,293 @@ FOCUS_HEIGHT = 1.8
 ZOOM_STEP = 0.85      # multiply focus distance by this per zoom in
 MIN_ZOOM = 0.3
 MAX_ZOOM = 3.0
+DEFAULT_FONT = "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf"
+FRAME_BUDGET_MS = 4.0  # time _drain_queue may spend per frame
+INGEST_CAP = PANEL_MAX_LINES  # pending lines kept per file before overflow
+OVERFLOW_POLICIES = ("drop-oldest", "drop-newest", "block")
+CULL_DISTANCE = 120.0  # panels further than this from the camera are not redrawn
+# level of detail by camera distance: full text, last lines, activity bar, card only
+LOD_FULL, LOD_TAIL, LOD_BAR, LOD_CARD = 0, 1, 2, 3
+LOD_FULL_DIST = 20.0
+LOD_TAIL_DIST = 40.0
+LOD_BAR_DIST = 80.0
+LOD_TAIL_LINES = 20
+ACTIVITY_FULL = 200.0  # decayed line count that fills the activity bar
+RENDERERS = ("text", "atlas")
+ATLAS_PIXEL_SIZE = 12  # glyph size in texels for the atlas renderer
+ATLAS_COLS = 96        # characters per row; longer lines are cut, not wrapped
+PANELS_PER_FRAME = 8   # panels constructed per frame while starting up
+ENGINES = ("threads", "asyncio", "processes")
+RETIRE_GRACE = 2.0     # --watch-dir: seconds a vanished file may take to reappear (rotation)
+REOPEN_READ_MAX = 1 << 20  # a file replacing a tailed one is read from its start up to this size
+WORKER_FLUSH = 0.005   # processes engine: seconds between batch messages from a worker
+SERVE_BACKLOG = 1000    # --serve: recent lines kept per file for new and resuming subscribers
+SERVE_OUT_CAP = 16 << 20  # --serve: bytes queued for one subscriber before it is dropped
+SUB_HEADER = struct.Struct("<BHQII")  # kind, file id, first seq, line count, payload bytes
+SUB_FILE, SUB_LINES = 0, 1             # frame kinds
+ROTATE_CHECK = 1.0     # asyncio file source: max seconds between rotation checks
+SEARCH_LIMIT = 1000    # hits kept per query
+SEARCH_PRUNE_PATHS = 32  # per-file indexes pruned of evicted lines per stats tick
+METER_TAU = 5.0        # seconds; time constant of the per-file EWMA rates
+HEAT_FULL = 1000.0     # lines/s that colours a card fully hot (log scale)
+CARD_COLOR = (0.06, 0.06, 0.07, 1)
+HEAT_COLOR = (0.6, 0.1, 0.03, 1)
+PROFILE_WINDOW = 600   # frames kept per profiled section (rolling histograms)
+PROFILE_TRACE_EVENTS = 500_000  # newest trace spans kept for --profile-trace
+LATENCY_WINDOW = 512   # read-to-display samples kept per panel for p50/p99
+FIELD_WINDOW = 60.0    # --parse: seconds of parsed fields the F7 aggregates cover
+FIELD_TOP = 5          # --parse: status codes listed per panel
+PARSE_FORMATS = ("auto", "json", "logfmt")
+FIELD_NAMES = {        # --parse: keys tried per field, first present wins (--field overrides)
+    "level": ("level", "lvl", "severity", "loglevel"),
+    "status": ("status", "status_code", "code", "http.status"),
+    "latency": ("latency", "latency_ms", "duration", "duration_ms", "elapsed", "took"),
+}
+LEVEL_NAMES = ("trace", "debug", "info", "warn", "error", "fatal", "other")
+SESSION_EVERY = 30.0   # --session: seconds between periodic snapshots
+SESSION_MAGIC = b"3DLSESS1"
+PROFILE_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.7, 33.3)
+
+# ----------------------------
+# Line splitting (bytes in, lines out)
+# ----------------------------
+READ_SIZE = 64 * 1024  # bytes per read(); bounds memory per wake-up
+
+
+class LineSplitter:
+    """Incremental line splitter over raw bytes.
+
+    Complete lines are split in one pass and decoded in bulk; only the
+    trailing partial line is carried over to the next feed().
+    """
+    __slots__ = ("partial", "encoding")
+
+    def __init__(self, encoding: str = "utf-8"):
+        self.partial = bytearray()
+        self.encoding = encoding
+
+    def feed(self, buf, n: int | None = None) -> List[str]:
+        """Split buf[:n] (bytes/bytearray); returns complete lines."""
+        if n is None:
+            n = len(buf)
+        nl = buf.rfind(b"\n", 0, n)
+        with memoryview(buf) as mv:
+            if nl == -1:
+                self.partial += mv[:n]
+                return []
+            if self.partial:
+                self.partial += mv[:nl]
+                text = str(self.partial, self.encoding, "replace")
+                self.partial.clear()
+            else:
+                text = str(mv[:nl], self.encoding, "replace")
+            self.partial += mv[nl + 1:n]
+        if "\r" in text:
+            # the last line's newline was sliced off above; its \r is still here
+            text = text.replace("\r\n", "\n")
+            if text.endswith("\r"):
+                text = text[:-1]
+        return text.split("\n")
+
+    def reset(self):
+        self.partial.clear()
+
+
+def read_lines(f, splitter: LineSplitter, buf: bytearray) -> Iterator[List[str]]:
+    """Read binary file f to EOF in len(buf) chunks, yielding each chunk's
+    complete lines: callers queue them as they go, so a burst (or a whole
+    file) is never held at once and the ingest cap bounds memory."""
+    size = len(buf)
+    while True:
+        n = f.readinto(buf)
+        if not n:
+            return
+        lines = splitter.feed(buf, n)
+        if lines:
+            yield lines
+        if n < size:
+            return
 
 # ----------------------------
 # Tail implementation (robust)
 # ----------------------------
-def follow_file(path: str, poll: float = 0.1):
+FilePos = Tuple[int, int]  # (inode, byte offset) to resume tailing from
+
+
+def seek_start(f, start: FilePos | None):
+    """Seek to start if it is still the same file and long enough, else to EOF."""
+    end = f.seek(0, 2)
+    if start is None:
+        return
+    try:
+        ino = os.fstat(f.fileno()).st_ino
+    except OSError:
+        return
+    if ino == start[0] and start[1] <= end:
+        f.seek(start[1])
+
+
+def seek_recent(f, limit: int = REOPEN_READ_MAX):
+    """Seek to the start of f or, if it holds more than limit bytes, to the
+    first line that starts within its last limit bytes."""
+    end = f.seek(0, 2)
+    if end <= limit:
+        f.seek(0)
+        return
+    at = end - limit - 1  # from the byte before, so a line starting right there is kept
+    f.seek(at)
+    while True:
+        chunk = f.read(BACKFILL_BLOCK)
+        if not chunk:
+            return  # no newline left: nothing whole to read yet
+        nl = chunk.find(b"\n")
+        if nl != -1:
+            f.seek(at + nl + 1)
+            return
+        at += len(chunk)
+
+
+def tail_lines(path: str, n: int, block: int = BACKFILL_BLOCK) -> Tuple[List[str], FilePos | None]:
+    """Last n complete lines of path, reading backwards from EOF (like tail -n).
+
+    Only the blocks holding those lines are read. Also returns the position
+    just after the last newline, so tailing can carry on from exactly there.
+    """
+    try:
+        f = open(path, "rb", buffering=0)
+    except OSError:
+        return [], None
+    with f:
+        ino = os.fstat(f.fileno()).st_ino
+        pos = f.seek(0, 2)
+        chunks: List[bytes] = []
+        newlines = 0
+        end = None  # offset after the last newline
+        while pos > 0 and (end is None or newlines <= n):
+            size = min(block, pos)
+            pos -= size
+            f.seek(pos)
+            chunk = f.read(size)
+            if end is None:
+                nl = chunk.rfind(b"\n")
+                if nl == -1:
+                    chunks.append(b"")  # trailing partial line only; keep looking
+                    continue
+                chunk = chunk[:nl + 1]
+                end = pos + nl + 1
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+        if end is None:
+            return [], (ino, 0)
+        data = b"".join(reversed(chunks))
+        text = str(data, "utf-8", "replace")[:-1]
+        lines = text.split("\n")
+        if pos > 0 or len(lines) > n:
+            lines = lines[-n:] if n > 0 else []
+        if "\r" in text:
+            lines = [ln[:-1] if ln.endswith("\r") else ln for ln in lines]
+        return lines, (ino, end)
+
+
+def _read_span(f, off: int, end: int, budget: int) -> bytes:
+    """Bytes off..end of f, or only whole lines among the last budget of them."""
+    start = max(off, end - budget)
+    f.seek(start)
+    data = f.read(end - start)
+    if start > off:
+        data = data[data.find(b"\n") + 1:]  # started mid-line
+    return data
+
+
+def read_since(path: str, start: FilePos, budget: int = SCROLLBACK_BYTES) -> Tuple[List[str], FilePos | None]:
+    """Complete lines written to path after start, read forward in bulk (--session).
+
+    If path was rotated meanwhile, the rest of the old file comes first when
+    an uncompressed rotated copy still has it. Only whole lines within the
+    last budget bytes are kept; tailing carries on from the returned position.
+    """
+    ino, off = start
+    data = b""
+    try:
+        same = os.stat(path).st_ino == ino
+    except OSError:
+        return [], None
+    if not same:
+        for sib in reversed(rotated_siblings(path)):
+            try:
+                with open(sib, "rb", buffering=0) as f:
+                    if os.fstat(f.fileno()).st_ino == ino:
+                        data = _read_span(f, off, f.seek(0, 2), budget)
+                        if data and not data.endswith(b"\n"):
+                            data += b"\n"  # it will not be written to any more
+                        break
+            except OSError:
+                pass
+        off = 0
+    try:
+        f = open(path, "rb", buffering=0)
+    except OSError:
+        return [], None
+    with f:
+        ino = os.fstat(f.fileno()).st_ino
+        end = f.seek(0, 2)
+        if off > end:
+            off = 0  # truncated in place
+        new = _read_span(f, off, end, budget)
+    nl = new.rfind(b"\n") + 1
+    pos = (ino, end - len(new) + nl)
+    data += new[:nl]
+    if len(data) > budget:
+        data = data[data.find(b"\n", len(data) - budget) + 1:]
+    if not data:
+        return [], pos
+    text = str(data, "utf-8", "replace")[:-1]
+    if "\r" in text:
+        # the last line's newline was sliced off above; its \r is still here
+        text = text.replace("\r\n", "\n")
+        if text.endswith("\r"):
+            text = text[:-1]
+    return text.split("\n"), pos
+
+
+def follow_file(path: str, poll: float = 0.1, start: FilePos | None = None):
     """Tail -f implementation that yields new lines (robust to rotations)."""
     while not os.path.exists(path):
         time.sleep(poll)
     try:
-        f = open(path, "r", errors="replace")
+        f = open(path, "rb", buffering=0)
     except Exception as e:
         yield f"[ERROR opening {path}: {e}]"
         return
 
     with f:
-        f.seek(0, 2)
+        seek_start(f, start)
         inode = None
         try:
             inode = os.fstat(f.fileno()).st_ino
         except Exception:
             inode = None
 
-        buff = ""
+        splitter = LineSplitter()
+        buf = bytearray(READ_SIZE)
         while True:
-            chunk = f.read()
-            if chunk:
-                buff += chunk
-                while True:
-                    nl = buff.find("\n")
-                    if nl == -1:
-                        break
-                    line, buff = buff[:nl], buff[nl+1:]
-                    yield line
-            else:
+            got = False
+            for lines in read_lines(f, splitter, buf):
+                got = True
+                yield from lines
+            if not got:
                 # rotation/truncate handling
                 try:
                     st = os.stat(path)
                     if inode is not None and st.st_ino != inode:
                         # reopen rotated file
                         try:
-                            nf = open(path, "r", errors="replace")
+                            nf = open(path, "rb", buffering=0)
                             f.close()
                             f = nf
                             f.seek(0, 2)
                             inode = os.fstat(f.fileno()).st_ino
+                            splitter.reset()
                         except Exception:
                             pass
                     else:
@@ -103,10 +420,11 @@ def follow_file(path: str, poll: float = 0.1):
                     while not os.path.exists(path):
                         time.sleep(poll)
                     try:
-                        nf = open(path, "r", errors="replace")
+                        nf = open(path, "rb", buffering=0)
                         f.close()
                         f = nf
                         f.seek(0, 2)
+                        splitter.reset()
                         try:
                             inode = os.fstat(f.fileno()).st_ino
                         except Exception:
@@ -115,46 +433,2622 @@ def follow_file(path: str, poll: float = 0.1):
                         pass
                 time.sleep(poll)
 
-# ----------------------------
-# Thread wrapper
-# ----------------------------
-class TailThread(threading.Thread):
-    daemon = True
+# ----------------------------
+# Filters and highlighting (applied in the ingest threads)
+# ----------------------------
+# highlights use TextNode inline markup: \1name\1 ... \2 (see App._register_highlights)
+HL_END = "\2"
+_MARKUP = re.compile("\x01[^\x01]*\x01|\x02")
+
+
+def strip_markup(line: str) -> str:
+    return _MARKUP.sub("", line) if "\x01" in line or "\x02" in line else line
+
+
+def combine_patterns(patterns: List[str]):
+    """One alternation regex for many patterns, so a line is scanned once."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{p})" for p in patterns))
+
+
+class LineFilter:
+    """Include/exclude/highlight rules for one panel, each compiled into one regex.
+
+    A line must match the global includes and, separately, the panel's own
+    includes; exclusions of either kind drop it, so they share one regex.
+    """
+    __slots__ = ("include", "panel_include", "exclude", "highlight", "names")
+
+    def __init__(self, include: List[str], exclude: List[str], highlights: List[Tuple[str, str]],
+                 panel_include: List[str] = ()):
+        self.include = combine_patterns(include)
+        self.panel_include = combine_patterns(panel_include)
+        self.exclude = combine_patterns(exclude)
+        # named groups tell which highlight matched: m.lastgroup -> "h<i>"
+        self.names = [name for name, _ in highlights]
+        self.highlight = re.compile("|".join(f"(?P<h{i}>{rx})" for i, (_, rx) in enumerate(highlights))) \
+            if highlights else None
+
+    def apply(self, lines: List[str], counts: Dict[str, int]) -> List[str]:
+        inc, pinc, exc, hl = self.include, self.panel_include, self.exclude, self.highlight
+        names = self.names
+
+        def mark(m):
+            name = names[int(m.lastgroup[1:])]
+            counts[name] = counts.get(name, 0) + 1
+            return f"\1hl-{name}\1{m.group(0)}{HL_END}"
+
+        out = []
+        dropped = 0
+        for line in lines:
+            if (inc is not None and inc.search(line) is None) or \
+                    (pinc is not None and pinc.search(line) is None) or \
+                    (exc is not None and exc.search(line) is not None):
+                dropped += 1
+                continue
+            if hl is not None:
+                line = hl.sub(mark, line)
+            out.append(line)
+        if dropped:
+            counts["filtered"] = counts.get("filtered", 0) + dropped
+        counts["shown"] = counts.get("shown", 0) + len(out)
+        return out
+
+
+class FilterSet:
+    """Global plus per-panel (path glob) rules; one LineFilter per path, built lazily.
+
+    Per-panel rules are (glob, "include"|"exclude", regex); the glob is tried
+    against the full path and its basename. They only narrow a panel: its
+    includes are checked on top of the global ones, not instead of them.
+    Counters are kept per path; ingest and backfill threads count into a
+    batch-local dict and merge it under the lock, which readers also take.
+    """
+
+    def __init__(self, include: List[str] = (), exclude: List[str] = (),
+                 per_panel: List[Tuple[str, str, str]] = (),
+                 highlights: List[Tuple[str, str]] = tuple((n, rx) for n, rx, _ in DEFAULT_HIGHLIGHTS),
+                 fixed_strings: bool = False):
+        esc = re.escape if fixed_strings else (lambda p: p)
+        self.include = [esc(p) for p in include]
+        self.exclude = [esc(p) for p in exclude]
+        self.per_panel = [(glob, kind, esc(rx)) for glob, kind, rx in per_panel]
+        self.highlights = list(highlights)
+        for rx in self.include + self.exclude + [rx for _, _, rx in self.per_panel] + \
+                [rx for _, rx in self.highlights]:
+            re.compile(rx)  # raises re.error early, with the offending pattern
+        self._filters: Dict[str, LineFilter] = {}
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def for_path(self, path: str) -> LineFilter:
+        flt = self._filters.get(path)
+        if flt is None:
+            base = os.path.basename(path)
+            pinc, exc = [], list(self.exclude)
+            for glob, kind, rx in self.per_panel:
+                if fnmatch(path, glob) or fnmatch(base, glob):
+                    (pinc if kind == "include" else exc).append(rx)
+            flt = self._filters[path] = LineFilter(self.include, exc, self.highlights, pinc)
+        return flt
+
+    def forget(self, path: str):
+        self._filters.pop(path, None)
+        with self._lock:
+            self.counts.pop(path, None)
+
+    def apply(self, path: str, lines: List[str]) -> List[str]:
+        if not lines:
+            return lines
+        batch: Dict[str, int] = {}
+        out = self.for_path(path).apply(lines, batch)
+        with self._lock:
+            counts = self.counts.get(path)
+            if counts is None:
+                counts = self.counts[path] = {}
+            for name, n in batch.items():
+                counts[name] = counts.get(name, 0) + n
+        return out
+
+    def counts_of(self, path: str) -> Dict[str, int] | None:
+        """A copy of path's counters, or None if it has none yet."""
+        with self._lock:
+            counts = self.counts.get(path)
+            return dict(counts) if counts is not None else None
+
+    def set_counts(self, path: str, counts: Dict[str, int]):
+        """Replace path's counters (as counted by an ingest worker process)."""
+        with self._lock:
+            self.counts[path] = counts
+
+    def summary(self, path: str) -> str:
+        counts = self.counts_of(path)
+        if not counts:
+            return ""
+        parts = [f"{counts[name]} {name}" for name, _ in self.highlights if counts.get(name)]
+        if counts.get("filtered"):
+            parts.append(f"{counts['filtered']} filtered")
+        return ", ".join(parts)
+
+# ----------------------------
+# Structured fields (--parse; applied in the ingest threads)
+# ----------------------------
+_LOGFMT = re.compile(r'([\w.-]+)=("(?:[^"\\]|\\.)*"|\S*)')
+_DURATION = re.compile(r"\s*([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)\s*(ns|us|µs|ms|s|m)?\s*")
+_DURATION_MS = {None: 1.0, "ns": 1e-6, "us": 1e-3, "µs": 1e-3, "ms": 1.0, "s": 1000.0, "m": 60000.0}
+_LEVEL_CODES = {name: i for i, name in enumerate(LEVEL_NAMES)}
+_LEVEL_CODES.update(warning=3, wrn=3, err=4, crit=5, critical=5, panic=5, emerg=5,
+                    notice=2, inf=2, dbg=1, trc=0)
+
+
+def parse_logfmt(line: str) -> Dict[str, str] | None:
+    pairs = _LOGFMT.findall(line)
+    if not pairs:
+        return None
+    return {k: v[1:-1].replace('\\"', '"') if v.startswith('"') else v for k, v in pairs}
+
+
+def parse_json(line: str) -> dict | None:
+    try:
+        rec = json.loads(line)
+    except ValueError:
+        return None
+    return rec if isinstance(rec, dict) else None
+
+
+def to_ms(value) -> float:
+    """A latency as milliseconds: numbers are taken as ms, "1.5s"/"250us" are converted."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    m = _DURATION.fullmatch(str(value))
+    return float(m.group(1)) * _DURATION_MS[m.group(2)] if m else nan
+
+
+class FieldColumns:
+    """A file's parsed fields as parallel arrays, one entry per line, over a
+    sliding time window. Written by ingest threads, read by the renderer.
+    """
+    __slots__ = ("window", "lock", "t", "level", "status", "latency")
+
+    def __init__(self, window: float = FIELD_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.t = array.array("d")        # time.monotonic() the line was read
+        self.level = array.array("b")    # index into LEVEL_NAMES, -1 if absent
+        self.status = array.array("H")   # 0 if absent
+        self.latency = array.array("d")  # ms, nan if absent
+
+    def extend(self, now: float, level: array.array, status: array.array, latency: array.array):
+        with self.lock:
+            self.t.extend(array.array("d", [now]) * len(level))
+            self.level.extend(level)
+            self.status.extend(status)
+            self.latency.extend(latency)
+            # trim in bulk, about every quarter window, rather than per batch
+            if self.t and self.t[0] < now - self.window * 1.25:
+                self.trim(now - self.window)
+
+    def trim(self, cutoff: float):
+        """Drop entries read before cutoff (caller holds the lock)."""
+        k = bisect_left(self.t, cutoff)
+        if k:
+            for a in (self.t, self.level, self.status, self.latency):
+                del a[:k]
+
+
+class FieldParser:
+    """Pulls level, status and latency out of JSON or logfmt lines.
+
+    Parsing is per line (json.loads / one regex); everything after it works
+    on FieldColumns in batches, see field_summary().
+    """
+
+    def __init__(self, fmt: str = "auto", names: Dict[str, Tuple[str, ...]] | None = None,
+                 window: float = FIELD_WINDOW):
+        if fmt not in PARSE_FORMATS:
+            raise ValueError(f"unknown format: {fmt}")
+        self.fmt = fmt
+        self.names = dict(FIELD_NAMES, **(names or {}))
+        self.window = window
+
+    def parse(self, line: str) -> dict | None:
+        if self.fmt == "json" or (self.fmt == "auto" and line.lstrip().startswith("{")):
+            return parse_json(line)
+        return parse_logfmt(line) if "=" in line else None
+
+    @staticmethod
+    def _pick(rec: dict, names: Tuple[str, ...]):
+        for name in names:
+            if name in rec:
+                return rec[name]
+            if "." in name:  # nested JSON: http.status
+                v = rec
+                for part in name.split("."):
+                    v = v.get(part) if isinstance(v, dict) else None
+                if v is not None:
+                    return v
+        return None
+
+    def feed(self, cols: FieldColumns, lines: List[str], now: float):
+        level, status, latency = array.array("b"), array.array("H"), array.array("d")
+        lv_names, st_names, lat_names = self.names["level"], self.names["status"], self.names["latency"]
+        pick = self._pick
+        for line in lines:
+            rec = self.parse(line)
+            if rec is None:
+                level.append(-1)
+                status.append(0)
+                latency.append(nan)
+                continue
+            v = pick(rec, lv_names)
+            level.append(-1 if v is None else _LEVEL_CODES.get(str(v).lower(), len(LEVEL_NAMES) - 1))
+            v = pick(rec, st_names)
+            try:
+                status.append(int(v) if v is not None and 0 < int(v) < 65536 else 0)
+            except (TypeError, ValueError):
+                status.append(0)
+            v = pick(rec, lat_names)
+            latency.append(nan if v is None else to_ms(v))
+        cols.extend(now, level, status, latency)
+
+
+def _column(a: array.array):
+    # a copy: the array must stay resizable for the ingest threads
+    with memoryview(a) as mv:
+        return np.array(mv)
+
+
+def field_summary(cols: FieldColumns, now: float, top: int = FIELD_TOP) -> List[str]:
+    """The F7 panel text: counts by level, top status codes and latency
+    percentiles over the window, computed with NumPy on whole columns.
+    """
+    with cols.lock:
+        cols.trim(now - cols.window)
+        level, status, latency = _column(cols.level), _column(cols.status), _column(cols.latency)
+    n = len(level)
+    parsed = int(np.count_nonzero((level >= 0) | (status > 0) | ~np.isnan(latency)))
+    out = [f"last {cols.window:.0f}s: {n} lines ({n / cols.window:.1f}/s), {parsed} with fields", ""]
+    counts = np.bincount(level[level >= 0], minlength=len(LEVEL_NAMES))
+    out.append("level   " + ("  ".join(f"{name} {c}" for name, c in zip(LEVEL_NAMES, counts.tolist()) if c)
+                             or "-"))
+    codes, hits = np.unique(status[status > 0], return_counts=True)
+    order = np.argsort(hits, kind="stable")[::-1][:top]
+    out.append("status  " + ("  ".join(f"{codes[i]}: {hits[i]}" for i in order) or "-"))
+    lat = latency[~np.isnan(latency)]
+    if len(lat):
+        p50, p90, p99 = np.percentile(lat, (50, 90, 99)).tolist()
+        out.append(f"latency p50 {p50:.1f}  p90 {p90:.1f}  p99 {p99:.1f}  max {lat.max():.1f} ms  (n={len(lat)})")
+    else:
+        out.append("latency -")
+    return out
+
+# ----------------------------
+# Bounded ingest buffer (tail threads -> renderer)
+# ----------------------------
+class FileMeter:
+    """Ingest counters for one file, before filtering.
+
+    count() runs in the file's ingest thread and only bumps totals; rates
+    (last interval and EWMA) are derived by sample() on the render thread.
+    Bytes are counted as decoded characters, exact for ASCII logs.
+    """
+    __slots__ = ("lines", "bytes", "drops", "last_write", "lps", "bps",
+                 "ewma_lps", "ewma_bps", "_t", "_lines", "_bytes")
+
+    def __init__(self):
+        self.lines = self.bytes = self.drops = 0
+        self.last_write = 0.0  # time.time() of the last batch, 0 if none yet
+        self.lps = self.bps = self.ewma_lps = self.ewma_bps = 0.0
+        self._t = time.monotonic()
+        self._lines = self._bytes = 0
+
+    def count(self, lines: List[str]):
+        if not lines:
+            return  # an empty read (asyncio rechecks, position updates) is no write
+        self.lines += len(lines)
+        self.bytes += sum(map(len, lines)) + len(lines)
+        self.last_write = time.time()
+
+    def sample(self, now: float):
+        dt = now - self._t
+        if dt <= 0:
+            return
+        self.lps = (self.lines - self._lines) / dt
+        self.bps = (self.bytes - self._bytes) / dt
+        a = 1.0 - exp(-dt / METER_TAU)
+        self.ewma_lps += a * (self.lps - self.ewma_lps)
+        self.ewma_bps += a * (self.bps - self.ewma_bps)
+        self._t, self._lines, self._bytes = now, self.lines, self.bytes
+
+    def heat(self) -> float:
+        return min(1.0, log1p(self.ewma_lps) / log1p(HEAT_FULL))
+
+    def badge(self) -> str:
+        if self.ewma_lps >= 0.5:
+            return f"{self.ewma_lps:.0f} l/s {self.ewma_bps / 1024:.1f} KB/s"
+        if self.last_write:
+            return f"idle {format_age(time.time() - self.last_write)}"
+        return ""
+
+
+def format_age(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.0f}h"
+
+
+class IngestBuffer:
+    """Per-file bounded line buffers with an overflow policy.
+
+    Tail threads put() lines; the render task takes whole per-file batches.
+    Policies: "drop-oldest" (default; panels only show the last lines anyway),
+    "drop-newest", or "block" (the writer thread waits for room).
+    Dropped lines are counted per file and reported with the next batch.
+    """
+
+    def __init__(self, cap: int = INGEST_CAP, policy: str = "drop-oldest"):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy: {policy}")
+        self.cap = max(1, cap)
+        self.policy = policy
+        self._cv = threading.Condition()
+        self._bufs: Dict[str, deque] = {}
+        self._ready: Dict[str, None] = {}  # insertion-ordered set of paths with data
+        self._skipped: Dict[str, int] = {}
+        self._stamps: Dict[str, float] = {}  # read time of the oldest pending batch
+        self._closed = False
+        self.total_in = 0
+        self.total_skipped = 0
+        self.filters: FilterSet | None = None
+        self.meters: Dict[str, FileMeter] = {}
+        # where tailing would resume after the lines put so far (--session);
+        # only tailers that know their offsets fill it in
+        self.positions: Dict[str, FilePos] = {}
+        self.parser: FieldParser | None = None
+        self.fields: Dict[str, FieldColumns] = {}
+
+    def meter(self, path: str) -> FileMeter:
+        m = self.meters.get(path)
+        if m is None:
+            m = self.meters.setdefault(path, FileMeter())
+        return m
+
+    def field_columns(self, path: str) -> FieldColumns:
+        cols = self.fields.get(path)
+        if cols is None:
+            cols = self.fields.setdefault(path, FieldColumns(self.parser.window))
+        return cols
+
+    def forget(self, path: str):
+        """Drop all that is kept for path (a retired file): pending lines,
+        position, meter, fields and filter counters."""
+        with self._cv:
+            self._bufs.pop(path, None)
+            self._ready.pop(path, None)
+            self._skipped.pop(path, None)
+            self._stamps.pop(path, None)
+            self.positions.pop(path, None)
+        self.meters.pop(path, None)
+        self.fields.pop(path, None)
+        if self.filters is not None:
+            self.filters.forget(path)
+
+    def put(self, item: Tuple[str, str]):
+        path, line = item
+        self.put_many(path, [line])
+
+    def put_many(self, path: str, lines: List[str], pos: FilePos | None = None):
+        """Queue lines read from path; pos is the offset just past them, if known."""
+        stamp = time.monotonic()
+        if lines:
+            self.meter(path).count(lines)
+            # fields come from the raw lines, before filters add markup
+            if self.parser is not None:
+                self.parser.feed(self.field_columns(path), lines, stamp)
+        # filter in the caller's (ingest) thread, before anything is queued
+        if self.filters is not None:
+            lines = self.filters.apply(path, lines)
+        self._put(path, lines, stamp, pos)
+
+    def _put(self, path: str, lines: List[str], stamp: float | None = None,
+             pos: FilePos | None = None):
+        if not lines and pos is None:
+            return
+        if stamp is None:
+            stamp = time.monotonic()
+        with self._cv:
+            if pos is not None:
+                self.positions[path] = pos  # under the lock, so cut() sees both or neither
+            if not lines:
+                return
+            buf = self._bufs.get(path)
+            if buf is None:
+                maxlen = None if self.policy == "block" else self.cap
+                buf = self._bufs[path] = deque(maxlen=maxlen)
+            self.total_in += len(lines)
+            if self.policy == "block":
+                i = 0
+                while i < len(lines):
+                    while len(buf) >= self.cap and not self._closed:
+                        self._cv.wait(0.5)
+                    room = self.cap - len(buf) if not self._closed else len(lines)
+                    buf.extend(lines[i:i + room])
+                    i += room
+                    self._ready[path] = None
+                    self._stamps.setdefault(path, stamp)
+                return
+            over = len(buf) + len(lines) - self.cap
+            if over > 0:
+                self._skipped[path] = self._skipped.get(path, 0) + over
+                self.total_skipped += over
+                self.meter(path).drops += over
+            if self.policy == "drop-newest":
+                room = self.cap - len(buf)
+                if room <= 0:
+                    return
+                lines = lines[:room]
+            buf.extend(lines)  # maxlen evicts the oldest
+            self._ready[path] = None
+            self._stamps.setdefault(path, stamp)
+
+    def ready_paths(self) -> List[str]:
+        """Paths with pending lines, longest-waiting first."""
+        with self._cv:
+            return list(self._ready)
+
+    def take(self, path: str) -> Tuple[List[str], int, float]:
+        """Pop all pending lines for path, the number dropped since last take,
+        and the time.monotonic() at which the oldest of them was read."""
+        with self._cv:
+            buf = self._bufs.get(path)
+            lines = list(buf) if buf else []
+            if buf:
+                buf.clear()
+            self._ready.pop(path, None)
+            skipped = self._skipped.pop(path, 0)
+            stamp = self._stamps.pop(path, 0.0)
+            if self.policy == "block":
+                self._cv.notify_all()
+        return lines, skipped, stamp
+
+    def cut(self) -> Tuple[List[Tuple[str, List[str], int, float]], Dict[str, FilePos]]:
+        """Take every pending batch together with the positions they end at.
+
+        Both are read under one lock, so the lines taken are exactly those
+        before the returned positions (a consistent point to resume from).
+        """
+        with self._cv:  # re-entrant: ready_paths()/take() lock it again
+            batches = [(path, *self.take(path)) for path in self.ready_paths()]
+            return batches, dict(self.positions)
+
+    def depth(self) -> int:
+        with self._cv:
+            return sum(len(b) for b in self._bufs.values())
+
+    def close(self):
+        """Release writers blocked under the "block" policy."""
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+
+# ----------------------------
+# Thread wrapper
+# ----------------------------
+class TailThread(threading.Thread):
+    daemon = True
+
+    def __init__(self, path: str, out_q: IngestBuffer, start: FilePos | None = None):
+        super().__init__(name=f"Tail-{os.path.basename(path)}")
+        self.path = path
+        self.q = out_q
+        self.start_pos = start  # not self.start: that is Thread.start()
+        self._stop = threading.Event()
+
+    def run(self):
+        try:
+            for line in follow_file(self.path, start=self.start_pos):
+                if self._stop.is_set():
+                    break
+                self.q.put((self.path, line))
+        except Exception as e:
+            self.q.put((self.path, f"[ERROR] {e}"))
+
+    def stop(self):
+        self._stop.set()
+
+# ----------------------------
+# inotify (Linux) via ctypes
+# ----------------------------
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (name follows)
+
+FILE_MASK = IN_MODIFY | IN_ATTRIB | IN_MOVE_SELF | IN_DELETE_SELF
+DIR_MASK = IN_CREATE | IN_MOVED_TO
+WATCH_MASK = IN_CREATE | IN_MOVED_TO | IN_DELETE | IN_MOVED_FROM
+
+
+class Inotify:
+    """Minimal inotify wrapper (no third-party deps). Raises OSError if unavailable."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify not available")
+        self._libc = libc
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e))
+        self.fd = fd
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), ctypes.c_uint32(mask))
+        if wd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e), path)
+        return wd
+
+    def rm_watch(self, wd: int):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        """Return pending (wd, mask, name) events; empty list if none."""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        off = 0
+        while off + IN_EVENT.size <= len(data):
+            wd, mask, _cookie, ln = IN_EVENT.unpack_from(data, off)
+            off += IN_EVENT.size
+            name = data[off:off + ln].rstrip(b"\0")
+            off += ln
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+def inotify_available() -> bool:
+    try:
+        Inotify().close()
+        return True
+    except (OSError, AttributeError):
+        return False
+
+# ----------------------------
+# Event-driven tail (one thread for all files)
+# ----------------------------
+class _WatchedFile:
+    __slots__ = ("path", "f", "inode", "splitter", "wd")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.f = None
+        self.inode = None
+        self.splitter = LineSplitter()
+        self.wd = None
+
+
+class InotifyTailer(threading.Thread):
+    """Tail many files from a single thread, reading only when inotify says so.
+
+    Each file gets a watch for writes and rotation (IN_MOVE_SELF /
+    IN_DELETE_SELF); its parent directory is watched for the path being
+    (re)created. Lines go to the queue as (path, line), like TailThread.
+    """
+    daemon = True
+
+    def __init__(self, paths: List[str], out_q: IngestBuffer,
+                 starts: Dict[str, FilePos] | None = None):
+        super().__init__(name="Tail-inotify")
+        self.paths = list(paths)
+        self.q = out_q
+        self.starts = starts or {}
+        self._stop_evt = threading.Event()
+        self._wake_r, self._wake_w = os.pipe()
+        self._ino: Inotify | None = None
+        self._by_wd: Dict[int, List[_WatchedFile]] = {}
+        self._dirs: Dict[int, Dict[str, List[_WatchedFile]]] = {}
+        self._files: List[_WatchedFile] = []
+        self._buf = bytearray(READ_SIZE)
+        self._cmds: deque = deque()  # ("add" | "remove", path, start) from other threads
+
+    # -- setup --
+    def _watch_dir(self, wf: _WatchedFile):
+        d = os.path.dirname(wf.path) or "."
+        try:
+            wd = self._ino.add_watch(d, DIR_MASK)
+        except OSError as e:
+            self.q.put((wf.path, f"[ERROR watching {d}: {e}]"))
+            return
+        self._dirs.setdefault(wd, {}).setdefault(os.path.basename(wf.path), []).append(wf)
+
+    def _open(self, wf: _WatchedFile, at_end: bool, start: FilePos | None = None) -> bool:
+        try:
+            f = open(wf.path, "rb", buffering=0)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            self.q.put((wf.path, f"[ERROR opening {wf.path}: {e}]"))
+            return False
+        if at_end:
+            seek_start(f, start)
+        else:
+            seek_recent(f)  # a rotation's new file, unless it arrived already big
+        wf.f = f
+        wf.splitter.reset()
+        try:
+            wf.inode = os.fstat(f.fileno()).st_ino
+        except Exception:
+            wf.inode = None
+        if wf.inode is not None:
+            self.q.put_many(wf.path, [], (wf.inode, f.tell()))
+        try:
+            wf.wd = self._ino.add_watch(wf.path, FILE_MASK)
+            self._by_wd.setdefault(wf.wd, []).append(wf)
+        except OSError:
+            wf.wd = None
+        return True
+
+    def _close(self, wf: _WatchedFile):
+        if wf.wd is not None:
+            lst = self._by_wd.get(wf.wd, [])
+            if wf in lst:
+                lst.remove(wf)
+            if not lst:
+                self._by_wd.pop(wf.wd, None)
+                self._ino.rm_watch(wf.wd)
+            wf.wd = None
+        if wf.f is not None:
+            try:
+                wf.f.close()
+            except Exception:
+                pass
+        wf.f = None
+        wf.inode = None
+
+    # -- reading --
+    def _read(self, wf: _WatchedFile):
+        f = wf.f
+        if f is None:
+            return
+        try:
+            if os.fstat(f.fileno()).st_size < f.tell():
+                # truncated in place (copytruncate): start over
+                f.seek(0)
+                wf.splitter.reset()
+        except OSError:
+            pass
+        for lines in read_lines(f, wf.splitter, self._buf):
+            pos = (wf.inode, f.tell() - len(wf.splitter.partial)) if wf.inode is not None else None
+            self.q.put_many(wf.path, lines, pos)
+
+    def _rotated(self, wf: _WatchedFile):
+        """Old inode moved/deleted: flush what is left, then follow the path."""
+        self._read(wf)
+        self._close(wf)
+        self._open(wf, at_end=False)
+        self._read(wf)
+
+    def _path_appeared(self, wf: _WatchedFile):
+        try:
+            ino = os.stat(wf.path).st_ino
+        except OSError:
+            return
+        if wf.f is not None and ino == wf.inode:
+            return
+        if wf.f is not None:
+            self._read(wf)
+            self._close(wf)
+        if self._open(wf, at_end=False):
+            self._read(wf)
+
+    # -- main loop --
+    def run(self):
+        try:
+            self._ino = Inotify()
+        except (OSError, AttributeError) as e:
+            for p in self.paths:
+                self.q.put((p, f"[ERROR] inotify unavailable: {e}"))
+            return
+        try:
+            for p in self.paths:
+                wf = _WatchedFile(p)
+                self._files.append(wf)
+                self._watch_dir(wf)
+                start = self.starts.get(p)
+                if self._open(wf, at_end=True, start=start) and start is not None:
+                    # catch up on what was written since the backfill/session
+                    # offset; an idle file would otherwise hide it until the
+                    # next write
+                    self._read(wf)
+            self._loop()
+        except Exception as e:
+            for wf in self._files:
+                self.q.put((wf.path, f"[ERROR] {e}"))
+        finally:
+            for wf in self._files:
+                self._close(wf)
+            self._ino.close()
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+
+    def _run_commands(self):
+        while self._cmds:
+            op, path, start = self._cmds.popleft()
+            known = [wf for wf in self._files if wf.path == path]
+            if op == "add" and not known:
+                # a file that just appeared: from start, or its end if None
+                wf = _WatchedFile(path)
+                self._files.append(wf)
+                self._watch_dir(wf)
+                if self._open(wf, at_end=True, start=start):
+                    self._read(wf)
+            elif op == "remove":
+                for wf in known:
+                    self._close(wf)
+                    self._files.remove(wf)
+                    for names in self._dirs.values():
+                        lst = names.get(os.path.basename(path))
+                        if lst and wf in lst:
+                            lst.remove(wf)
+                # lines put between the viewer's forget and now recreated state
+                self.q.forget(path)
+
+    def _loop(self):
+        ino_fd = self._ino.fileno()
+        while not self._stop_evt.is_set():
+            r, _, _ = select.select([ino_fd, self._wake_r], [], [])
+            if self._wake_r in r:
+                os.read(self._wake_r, 4096)
+                if self._stop_evt.is_set():
+                    break
+                self._run_commands()
+                if ino_fd not in r:
+                    continue
+            dirty: Dict[int, _WatchedFile] = {}
+            for wd, mask, name in self._ino.read_events():
+                if mask & IN_Q_OVERFLOW:
+                    # lost events: re-check everything
+                    for wf in self._files:
+                        if wf.f is None:
+                            self._path_appeared(wf)
+                        else:
+                            dirty[id(wf)] = wf
+                    continue
+                if wd in self._dirs:
+                    for wf in self._dirs[wd].get(name, ()):
+                        self._path_appeared(wf)
+                    continue
+                for wf in list(self._by_wd.get(wd, ())):
+                    if mask & (IN_MOVE_SELF | IN_DELETE_SELF):
+                        dirty.pop(id(wf), None)
+                        self._rotated(wf)
+                    elif mask & (IN_MODIFY | IN_ATTRIB):
+                        dirty[id(wf)] = wf
+                if mask & IN_IGNORED:
+                    self._by_wd.pop(wd, None)
+            # coalesce: one read per file per wake-up
+            for wf in dirty.values():
+                self._read(wf)
+
+    def add(self, path: str, start: FilePos | None = None):
+        """Start following path from start (its end if None); safe from any thread."""
+        self._cmds.append(("add", path, start))
+        self._wake()
+
+    def remove(self, path: str):
+        self._cmds.append(("remove", path, None))
+        self._wake()
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+
+    def stop(self):
+        self._stop_evt.set()
+        self._wake()
+
+
+class DirWatcher(threading.Thread):
+    """Reports files matching (directory, name glob) specs appearing and vanishing.
+
+    Watches are set before each directory is listed once (initial), so no
+    file falls between the two; after that only inotify directory events
+    are used, nothing is rescanned on a timer. Events are ("add", path) and
+    ("gone", path) tuples in self.events, plus ("resync", "") when the
+    kernel queue overflowed and callers should check what they track.
+    """
+    daemon = True
+
+    def __init__(self, specs: List[Tuple[str, str]]):
+        super().__init__(name="Watch-dirs")
+        self.events: deque = deque()
+        self._ino = Inotify()
+        self._wake_r, self._wake_w = os.pipe()
+        self._stop_evt = threading.Event()
+        self._dirs: Dict[int, Tuple[str, List[str]]] = {}
+        for d, pattern in specs:
+            wd = self._ino.add_watch(d, WATCH_MASK)
+            self._dirs.setdefault(wd, (d, []))[1].append(pattern)
+        self.initial = self.scan()
+
+    def scan(self) -> List[str]:
+        found = []
+        for d, patterns in self._dirs.values():
+            try:
+                names = sorted(os.listdir(d))
+            except OSError:
+                continue
+            for name in names:
+                path = os.path.join(d, name)
+                if any(fnmatch(name, p) for p in patterns) and os.path.isfile(path):
+                    found.append(path)
+        return found
+
+    def run(self):
+        ino_fd = self._ino.fileno()
+        try:
+            while not self._stop_evt.is_set():
+                r, _, _ = select.select([ino_fd, self._wake_r], [], [])
+                if self._wake_r in r:
+                    break
+                for wd, mask, name in self._ino.read_events():
+                    if mask & IN_Q_OVERFLOW:
+                        self.events.extend(("add", p) for p in self.scan())
+                        self.events.append(("resync", ""))
+                        continue
+                    d, patterns = self._dirs.get(wd, ("", ()))
+                    if not name or not any(fnmatch(name, p) for p in patterns):
+                        continue
+                    path = os.path.join(d, name)
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        if os.path.isfile(path):
+                            self.events.append(("add", path))
+                    elif mask & (IN_DELETE | IN_MOVED_FROM):
+                        self.events.append(("gone", path))
+        finally:
+            self._ino.close()
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+
+    def stop(self):
+        self._stop_evt.set()
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+
+
+def watch_specs(dirs: List[str], globs: List[str]) -> List[Tuple[str, str]]:
+    """(directory, name pattern) pairs from --watch-dir DIR and --glob DIR/PATTERN."""
+    specs = []
+    for d in dirs:
+        if not os.path.isdir(d):
+            raise ValueError(f"--watch-dir {d}: not a directory")
+        specs.append((os.path.abspath(d), "*"))
+    for g in globs:
+        d, pattern = os.path.split(os.path.abspath(g))
+        if any(c in d for c in "*?["):
+            raise ValueError(f"--glob {g}: wildcards are only supported in the file name")
+        if not os.path.isdir(d):
+            raise ValueError(f"--glob {g}: {d} is not a directory")
+        specs.append((d, pattern))
+    return specs
+
+# ----------------------------
+# Ingest in worker processes (--engine processes)
+# ----------------------------
+class PipeSink:
+    """IngestBuffer's writer side, inside a worker process.
+
+    Tailers put lines here as they would into an IngestBuffer; they are
+    metered and filtered in the worker, kept per file (last `cap` lines,
+    older ones counted as dropped) and sent to the viewer as one pipe
+    message per WORKER_FLUSH.
+    """
+
+    def __init__(self, conn, filters: FilterSet | None, cap: int = INGEST_CAP):
+        self.conn = conn
+        self.filters = filters
+        self.cap = cap
+        self._lock = threading.Lock()
+        # path -> [lines, read stamp, raw lines, raw chars, dropped]
+        self._pending: Dict[str, list] = {}
+
+    def put(self, item: Tuple[str, str]):
+        path, line = item
+        self.put_many(path, [line])
+
+    def put_many(self, path: str, lines: List[str], pos: FilePos | None = None):
+        # pos is not forwarded: --session needs the threads engine
+        if not lines:
+            return
+        stamp = time.monotonic()  # CLOCK_MONOTONIC: comparable across processes
+        raw, chars = len(lines), sum(map(len, lines)) + len(lines)
+        if self.filters is not None:
+            lines = self.filters.apply(path, lines)
+        with self._lock:
+            b = self._pending.get(path)
+            if b is None:
+                b = self._pending[path] = [lines, stamp, raw, chars, 0]
+            else:
+                b[0].extend(lines)
+                b[2] += raw
+                b[3] += chars
+            over = len(b[0]) - self.cap
+            if over > 0:
+                del b[0][:over]
+                b[4] += over
+
+    def run(self, stop):
+        """Ship pending batches until stop is set or the viewer goes away."""
+        while not stop.wait(WORKER_FLUSH):
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                continue
+            filters = self.filters
+            msg = [(path, lines, stamp, raw, chars, dropped,
+                    filters.counts_of(path) if filters is not None else None)
+                   for path, (lines, stamp, raw, chars, dropped) in pending.items()]
+            try:
+                self.conn.send(msg)
+            except (BrokenPipeError, OSError):
+                return
+
+
+def _ingest_worker(paths: List[str], conn, ctl, filters: FilterSet | None, cap: int, stop):
+    try:
+        starts = ctl.recv()  # FilePos per path, sent once backfill is done
+    except (EOFError, OSError):
+        return
+    sink = PipeSink(conn, filters, cap)
+    if inotify_available():
+        tailers = [InotifyTailer(paths, sink, starts=starts)]
+    else:
+        tailers = [TailThread(p, sink, start=starts.get(p)) for p in paths]
+    for t in tailers:
+        t.start()
+    sink.run(stop)
+    for t in tailers:
+        t.stop()
+
+
+class ProcessIngestEngine(IngestBuffer):
+    """Tails files in worker processes, each owning a shard of the files.
+
+    Workers run the usual tailers (inotify or polling), decode, filter and
+    meter in their own interpreter, and send batches over a pipe. One
+    receiver thread here only unpickles them into the inherited buffer, so
+    ingest CPU scales with workers instead of sharing the render thread's
+    GIL. Workers are forked at construction, before Panda opens a window,
+    and wait for start() to send their start offsets.
+    """
+
+    def __init__(self, paths: List[str], workers: int, filters: FilterSet | None = None,
+                 cap: int = INGEST_CAP, policy: str = "drop-oldest"):
+        if policy == "block":
+            raise ValueError("the processes engine does not support the block policy")
+        super().__init__(cap=cap, policy=policy)
+        self.filters = filters  # applied by the workers; counts mirrored here
+        ctx = multiprocessing.get_context("fork")
+        self._stop = ctx.Event()
+        n = max(1, min(workers, len(paths)))
+        self.shards = [paths[i::n] for i in range(n)]
+        self._conns = []
+        self._ctls = []
+        self._procs = []
+        for i, shard in enumerate(self.shards):
+            recv, send = ctx.Pipe(duplex=False)
+            ctl_recv, ctl_send = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_ingest_worker, name=f"Ingest-{i}", daemon=True,
+                               args=(shard, send, ctl_recv, filters, cap, self._stop))
+            proc.start()
+            send.close()
+            ctl_recv.close()
+            self._conns.append(recv)
+            self._ctls.append(ctl_send)
+            self._procs.append(proc)
+        self._thread = threading.Thread(target=self._receive, name="Ingest-receiver", daemon=True)
+
+    def start(self, starts: Dict[str, FilePos] | None = None):
+        starts = starts or {}
+        for ctl, shard in zip(self._ctls, self.shards):
+            ctl.send({p: starts[p] for p in shard if p in starts})
+        self._thread.start()
+
+    def _receive(self):
+        conns = list(self._conns)
+        while conns:
+            for conn in multiprocessing.connection.wait(conns):
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    conns.remove(conn)
+                    continue
+                now = time.time()
+                for path, lines, stamp, raw, chars, dropped, counts in msg:
+                    m = self.meter(path)
+                    m.lines += raw
+                    m.bytes += chars
+                    m.last_write = now
+                    if dropped:
+                        with self._cv:
+                            self._skipped[path] = self._skipped.get(path, 0) + dropped
+                            self.total_skipped += dropped
+                            m.drops += dropped
+                    if counts is not None and self.filters is not None:
+                        self.filters.set_counts(path, counts)
+                    self._put(path, lines, stamp)
+
+    def stop(self):
+        self._stop.set()
+        for proc in self._procs:
+            proc.join(timeout=0.5)
+            if proc.is_alive():
+                proc.terminate()
+
+# ----------------------------
+# Tail daemon and subscribers (--serve / --subscribe)
+# ----------------------------
+# Protocol, over a Unix stream socket: the subscriber sends one JSON line
+#   {"files": [path, ...] | null, "epoch": E | null, "resume": {path: seq}, "backlog": N}
+# and then only reads frames: SUB_HEADER followed by its payload.
+#   SUB_FILE   payload {"path": ..., "epoch": ...}; names file id fid
+#   SUB_LINES  payload "\n".join(lines); seq numbers the first line
+# Line seq numbers count per file from daemon start (epoch). A frame whose
+# seq is past what the subscriber expected means lines it will never get.
+def sub_frame(kind: int, fid: int, seq: int, count: int, payload: bytes) -> bytes:
+    return SUB_HEADER.pack(kind, fid, seq, count, len(payload)) + payload
+
+
+class _Published:
+    __slots__ = ("fid", "path", "seq", "backlog", "held")
+
+    def __init__(self, fid: int, path: str):
+        self.fid = fid
+        self.path = path
+        self.seq = 0              # seq of the next line
+        self.backlog: deque = deque()  # (first seq, lines, frame), oldest first
+        self.held = 0
+
+
+class _Subscriber:
+    __slots__ = ("sock", "hello", "fids", "out", "dropped")
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.hello = bytearray()  # until the subscription line is complete
+        self.fids: set | None = None
+        self.out = bytearray()
+        self.dropped = False
+
+
+class TailDaemon:
+    """Headless tailing for many viewers: each file is read once, here.
+
+    Tailers put() into it like into an IngestBuffer; every batch gets seq
+    numbers, is encoded once and queued for each subscriber of the file.
+    The last `backlog` lines per file are kept so new subscribers start
+    with context and reconnecting ones resume without a gap. A subscriber
+    too slow to keep SERVE_OUT_CAP bytes in check is disconnected; it
+    resumes from its seq numbers when it reconnects.
+    """
+
+    def __init__(self, paths: List[str], sock_path: str, backlog: int = SERVE_BACKLOG):
+        self.epoch = int(time.time())
+        self.backlog = backlog
+        self.files = {p: _Published(i, p) for i, p in enumerate(paths)}
+        self.sock_path = sock_path
+        self._lock = threading.Lock()
+        self._subs: Dict[int, _Subscriber] = {}
+        self._stop = threading.Event()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_w, False)
+        if os.path.lexists(sock_path):
+            if not stat.S_ISSOCK(os.lstat(sock_path).st_mode):
+                raise ValueError(f"{sock_path} exists and is not a socket")
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(sock_path)
+                raise ValueError(f"a daemon is already serving {sock_path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                remove_stale_socket(sock_path)  # of a daemon that died
+            finally:
+                probe.close()
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(sock_path)
+        self._listener.listen(64)
+        self._listener.setblocking(False)
+
+    # -- sink side (tailer threads) --
+    def put(self, item: Tuple[str, str]):
+        path, line = item
+        self.put_many(path, [line])
+
+    def put_many(self, path: str, lines: List[str], pos: FilePos | None = None):
+        pub = self.files.get(path)
+        if pub is None or not lines:
+            return
+        with self._lock:
+            frame = self._publish(pub, lines)
+            for sub in self._subs.values():
+                if sub.fids is not None and pub.fid in sub.fids and not sub.dropped:
+                    sub.out += frame
+                    if len(sub.out) > SERVE_OUT_CAP:
+                        sub.dropped = True
+        self._wake()
+
+    def _publish(self, pub: _Published, lines: List[str]) -> bytes:
+        frame = sub_frame(SUB_LINES, pub.fid, pub.seq, len(lines),
+                          "\n".join(lines).encode("utf-8", "replace"))
+        pub.backlog.append((pub.seq, lines, frame))
+        pub.seq += len(lines)
+        pub.held += len(lines)
+        while pub.backlog and pub.held - len(pub.backlog[0][1]) >= self.backlog:
+            pub.held -= len(pub.backlog.popleft()[1])
+        return frame
+
+    def preload(self) -> Dict[str, FilePos]:
+        """Fill each backlog from the end of its file; returns where to tail from."""
+        starts = {}
+        with ThreadPoolExecutor(max_workers=min(BACKFILL_WORKERS, max(1, len(self.files)))) as pool:
+            for path, (lines, pos) in zip(self.files, pool.map(
+                    lambda p: tail_lines(p, self.backlog), self.files)):
+                if lines:
+                    self._publish(self.files[path], lines)
+                if pos is not None:
+                    starts[path] = pos
+        return starts
+
+    # -- socket side --
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass  # pipe full: a wake-up is pending anyway
+
+    def _subscribe(self, sub: _Subscriber, hello: dict):
+        want = hello.get("files")
+        resume = (hello.get("resume") or {}) if hello.get("epoch") == self.epoch else {}
+        fresh = max(0, int(hello.get("backlog", 0)))
+        pubs = [self.files[p] for p in want if p in self.files] if want is not None else list(self.files.values())
+        with self._lock:
+            for pub in pubs:
+                sub.out += sub_frame(SUB_FILE, pub.fid, pub.seq, 0,
+                                     json.dumps({"path": pub.path, "epoch": self.epoch}).encode())
+                start = resume.get(pub.path, pub.seq - fresh)
+                for seq, lines, frame in pub.backlog:
+                    if seq + len(lines) <= start:
+                        continue
+                    if seq >= start:
+                        sub.out += frame
+                    else:
+                        rest = lines[start - seq:]
+                        sub.out += sub_frame(SUB_LINES, pub.fid, start, len(rest),
+                                             "\n".join(rest).encode("utf-8", "replace"))
+            sub.fids = {pub.fid for pub in pubs}
+
+    def _drop(self, sub: _Subscriber, why: str):
+        with self._lock:
+            self._subs.pop(sub.sock.fileno(), None)
+        sub.sock.close()
+        print(f"[INFO] subscriber left ({why}); {len(self._subs)} connected")
+
+    def serve_forever(self):
+        lfd = self._listener.fileno()
+        while not self._stop.is_set():
+            with self._lock:
+                subs = dict(self._subs)
+            wlist = [fd for fd, sub in subs.items() if sub.out]
+            r, w, _ = select.select([lfd, self._wake_r, *subs], wlist, [])
+            if self._wake_r in r:
+                os.read(self._wake_r, 4096)
+            if lfd in r:
+                try:
+                    conn, _ = self._listener.accept()
+                except OSError:
+                    conn = None
+                if conn is not None:
+                    conn.setblocking(False)
+                    with self._lock:
+                        self._subs[conn.fileno()] = _Subscriber(conn)
+            for fd in r:
+                sub = subs.get(fd)
+                if sub is None:
+                    continue
+                try:
+                    data = sub.sock.recv(65536)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    data = b""
+                if not data:
+                    self._drop(sub, "closed")
+                    continue
+                if sub.fids is None:
+                    sub.hello += data
+                    if b"\n" in sub.hello:
+                        try:
+                            self._subscribe(sub, json.loads(sub.hello.split(b"\n", 1)[0]))
+                        except (ValueError, TypeError, AttributeError) as e:
+                            self._drop(sub, f"bad subscription: {e}")
+                            continue
+                        print(f"[INFO] subscriber joined ({len(sub.fids)} files); {len(self._subs)} connected")
+            for fd in w:
+                sub = subs.get(fd)
+                if sub is None or fd not in self._subs:
+                    continue
+                with self._lock:
+                    try:
+                        n = sub.sock.send(sub.out)
+                    except BlockingIOError:
+                        n = 0
+                    except OSError:
+                        n = -1
+                    if n > 0:
+                        del sub.out[:n]
+                if n < 0:
+                    self._drop(sub, "send failed")
+            for sub in [s for s in subs.values() if s.dropped and s.sock.fileno() in self._subs]:
+                self._drop(sub, "too slow")
+
+    def stop(self):
+        self._stop.set()
+        self._wake()
+
+    def close(self):
+        for sub in list(self._subs.values()):
+            sub.sock.close()
+        self._listener.close()
+        try:
+            os.unlink(self.sock_path)
+        except OSError:
+            pass
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+
+def serve(paths: List[str], sock_path: str, backlog: int = SERVE_BACKLOG):
+    """Run the tail daemon until interrupted (--serve)."""
+    daemon = TailDaemon(paths, sock_path, backlog)
+    starts = daemon.preload()
+    if inotify_available():
+        tailers = [InotifyTailer(paths, daemon, starts=starts)]
+    else:
+        tailers = [TailThread(p, daemon, start=starts.get(p)) for p in paths]
+    for t in tailers:
+        t.start()
+    print(f"[INFO] serving {len(paths)} files on {sock_path}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for t in tailers:
+            t.stop()
+        daemon.close()
+
+
+class SubscribeEngine(IngestBuffer):
+    """Lines from a tail daemon instead of local tailers (--subscribe).
+
+    One thread reads frames into the inherited buffer (filters and meters
+    apply here, per viewer). It reconnects with backoff and resumes each
+    file from the next seq it expects; lines the daemon no longer has are
+    counted as dropped. Paths the daemon announces are queued in
+    `announced` for the App to give panels.
+    """
+
+    def __init__(self, sock_path: str, paths: List[str] | None = None, backlog: int = 0,
+                 cap: int = INGEST_CAP, policy: str = "drop-oldest"):
+        super().__init__(cap=cap, policy=policy)
+        self.sock_path = sock_path
+        self.paths = paths
+        self.backlog = backlog
+        self.epoch: int | None = None
+        self.expected: Dict[str, int] = {}  # next seq per path
+        self.announced: deque = deque()
+        self.connected = False
+        self._stop = threading.Event()
+        self._sock: socket.socket | None = None
+        self._thread = threading.Thread(target=self._run, name="Subscribe", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        delay = 0.1
+        warned = False
+        while not self._stop.is_set():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.sock_path)
+                self._sock = sock
+                hello = {"files": self.paths, "epoch": self.epoch, "resume": self.expected,
+                         "backlog": self.backlog}
+                sock.sendall(json.dumps(hello).encode() + b"\n")
+                self.connected = True
+                delay, warned = 0.1, False
+                self._receive(sock.makefile("rb"))
+            except OSError as e:
+                if not warned:
+                    print(f"[WARN] tail daemon {self.sock_path}: {e}; retrying")
+                    warned = True
+            finally:
+                self.connected = False
+                self._sock = None
+                sock.close()
+            self._stop.wait(delay)
+            delay = min(delay * 2, 5.0)
+
+    def _receive(self, f):
+        fids: Dict[int, str] = {}
+        while True:
+            head = f.read(SUB_HEADER.size)
+            if len(head) < SUB_HEADER.size:
+                return
+            kind, fid, seq, count, size = SUB_HEADER.unpack(head)
+            payload = f.read(size)
+            if len(payload) < size:
+                return
+            if kind == SUB_FILE:
+                info = json.loads(payload)
+                if info["epoch"] != self.epoch:
+                    self.epoch = info["epoch"]  # a new daemon: seq numbers start over
+                    self.expected.clear()
+                fids[fid] = info["path"]
+                self.announced.append(info["path"])
+                continue
+            path = fids.get(fid)
+            if kind != SUB_LINES or path is None:
+                continue
+            lines = str(payload, "utf-8", "replace").split("\n")
+            exp = self.expected.get(path)
+            end = seq + count
+            if exp is not None:
+                if seq < exp:
+                    lines = lines[exp - seq:]  # already have these
+                elif seq > exp:
+                    self._lost(path, seq - exp)
+                end = max(end, exp)
+            self.expected[path] = end
+            self.put_many(path, lines)
+
+    def _lost(self, path: str, n: int):
+        with self._cv:
+            self._skipped[path] = self._skipped.get(path, 0) + n
+            self.total_skipped += n
+            self.meter(path).drops += n
+            self._ready[path] = None
+
+    def stop(self):
+        self._stop.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+# ----------------------------
+# asyncio ingest engine (optional, one thread for all sources)
+# ----------------------------
+class LineSource:
+    """Something that produces lines for one panel, named by key."""
+
+    def __init__(self, key: str):
+        self.key = key
+
+    async def run(self, engine: "AsyncIngestEngine"):
+        raise NotImplementedError
+
+    async def _pump(self, reader: asyncio.StreamReader, engine: "AsyncIngestEngine"):
+        splitter = LineSplitter()
+        while True:
+            chunk = await reader.read(READ_SIZE)
+            if not chunk:
+                break
+            engine.emit(self.key, splitter.feed(chunk))
+        if splitter.partial:
+            engine.emit(self.key, [str(splitter.partial, "utf-8", "replace")])
+
+
+class FileSource(LineSource):
+    """tail -F a file; woken by the engine's inotify, rechecks rotation every ROTATE_CHECK s."""
+
+    def __init__(self, path: str, start: FilePos | None = None):
+        super().__init__(path)
+        self.path = path
+        self.start = start
+        self.changed: asyncio.Event | None = None
+
+    async def run(self, engine: "AsyncIngestEngine"):
+        self.changed = asyncio.Event()
+        splitter = LineSplitter()
+        buf = bytearray(READ_SIZE)
+        f = None
+        inode = None
+        at_end = True
+        while True:
+            if f is None:
+                try:
+                    f = open(self.path, "rb", buffering=0)
+                    if at_end:
+                        seek_start(f, self.start)
+                    inode = os.fstat(f.fileno()).st_ino
+                    splitter.reset()
+                    engine.watch(self.path, self)
+                except FileNotFoundError:
+                    f = None
+                except OSError as e:
+                    engine.emit(self.key, [f"[ERROR opening {self.path}: {e}]"])
+                    return
+            if f is not None:
+                try:
+                    if os.fstat(f.fileno()).st_size < f.tell():
+                        f.seek(0)
+                        splitter.reset()
+                except OSError:
+                    pass
+                for lines in read_lines(f, splitter, buf):
+                    engine.emit(self.key, lines)
+                try:
+                    rotated = os.stat(self.path).st_ino != inode
+                except FileNotFoundError:
+                    rotated = True
+                if rotated:
+                    for lines in read_lines(f, splitter, buf):
+                        engine.emit(self.key, lines)
+                    f.close()
+                    f = None
+                    at_end = False  # the new file is read from its start
+                    continue
+            self.changed.clear()
+            try:
+                await asyncio.wait_for(self.changed.wait(), ROTATE_CHECK)
+            except asyncio.TimeoutError:
+                pass
+
+
+class CommandSource(LineSource):
+    """stdout+stderr of a long-running command, e.g. journalctl -f."""
+
+    def __init__(self, key: str, argv: List[str]):
+        super().__init__(key)
+        self.argv = argv
+
+    async def run(self, engine: "AsyncIngestEngine"):
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self.argv, stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+        except OSError as e:
+            engine.emit(self.key, [f"[ERROR running {self.argv[0]}: {e}]"])
+            return
+        try:
+            await self._pump(proc.stdout, engine)
+            rc = await proc.wait()
+            engine.emit(self.key, [f"[exited with status {rc}]"])
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+
+
+def remove_stale_socket(path: str):
+    """Unlink a leftover socket at path before binding; anything else is an error."""
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise ValueError(f"{path} exists and is not a socket")
+    os.unlink(path)
+
+
+class UnixSocketSource(LineSource):
+    """Listen on a Unix stream socket; every client's lines go to one panel."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.path = path
+
+    async def run(self, engine: "AsyncIngestEngine"):
+        try:
+            remove_stale_socket(self.path)
+        except (OSError, ValueError) as e:
+            engine.emit(self.key, [f"[ERROR listening on {self.path}: {e}]"])
+            return
+
+        async def client(reader, writer):
+            try:
+                await self._pump(reader, engine)
+            finally:
+                writer.close()
+
+        server = await asyncio.start_unix_server(client, path=self.path)
+        async with server:
+            await server.serve_forever()
+
+
+class FifoSource(LineSource):
+    """Read a named pipe; opened O_RDWR so it never sees EOF between writers."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.path = path
+
+    async def run(self, engine: "AsyncIngestEngine"):
+        loop = asyncio.get_running_loop()
+        fd = os.open(self.path, os.O_RDWR | os.O_NONBLOCK)
+        reader = asyncio.StreamReader()
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(fd, "rb", buffering=0))
+        try:
+            await self._pump(reader, engine)
+        finally:
+            transport.close()
+
+
+class AsyncIngestEngine(IngestBuffer):
+    """Runs all LineSources on one asyncio loop in a background thread.
+
+    The loop thread collects lines into a per-tick {key: [lines]} dict and
+    hands it over with one deque.append (atomic, no lock). The render thread
+    pulls the handoff deque once per frame into the inherited IngestBuffer,
+    so the buffer's lock is only ever taken by that one thread.
+    """
+
+    def __init__(self, sources: List[LineSource], cap: int = INGEST_CAP,
+                 policy: str = "drop-oldest"):
+        if policy == "block":
+            raise ValueError("the asyncio engine does not support the block policy")
+        super().__init__(cap=cap, policy=policy)
+        self.sources = sources
+        self._handoff: deque = deque()
+        self._acc: Dict[str, List[str]] = {}
+        self._acc_stamps: Dict[str, float] = {}
+        self._acc_drops: Dict[str, int] = {}  # trimmed from _acc to stay within cap
+        self._flush_pending = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread = threading.Thread(target=self._thread_main, name="Ingest-asyncio", daemon=True)
+        self._ino: Inotify | None = None
+        self._watches: Dict[int, List[FileSource]] = {}
+
+    # -- render thread --
+    def start(self):
+        self._thread.start()
+
+    def _pull(self):
+        handoff = self._handoff
+        while handoff:
+            acc, stamps, drops = handoff.popleft()
+            for key, lines in acc.items():
+                self._put(key, lines, stamps[key])  # already filtered in emit()
+            if drops:
+                with self._cv:
+                    for key, n in drops.items():
+                        self._skipped[key] = self._skipped.get(key, 0) + n
+                        self.total_skipped += n
+                        self.meter(key).drops += n
+
+    def ready_paths(self) -> List[str]:
+        self._pull()
+        return super().ready_paths()
+
+    def depth(self) -> int:
+        self._pull()
+        return super().depth()
+
+    def stop(self):
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(loop.stop)
+
+    # -- loop thread --
+    def emit(self, key: str, lines: List[str]):
+        stamp = time.monotonic()
+        self.meter(key).count(lines)
+        if self.parser is not None and lines:
+            self.parser.feed(self.field_columns(key), lines, stamp)
+        if self.filters is not None:
+            lines = self.filters.apply(key, lines)
+        if not lines:
+            return
+        acc = self._acc.setdefault(key, [])
+        acc.extend(lines)
+        over = len(acc) - self.cap
+        if over > 0:
+            # a whole file read in one tick: keep only what the buffer would
+            if self.policy == "drop-newest":
+                del acc[self.cap:]
+            else:
+                del acc[:over]
+            self._acc_drops[key] = self._acc_drops.get(key, 0) + over
+        self._acc_stamps.setdefault(key, stamp)
+        if not self._flush_pending:
+            self._flush_pending = True
+            self._loop.call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_pending = False
+        if self._acc:
+            acc, self._acc = self._acc, {}
+            stamps, self._acc_stamps = self._acc_stamps, {}
+            drops, self._acc_drops = self._acc_drops, {}
+            self._handoff.append((acc, stamps, drops))
+
+    def watch(self, path: str, source: FileSource):
+        if self._ino is None:
+            return
+        try:
+            wd = self._ino.add_watch(path, FILE_MASK)
+        except OSError:
+            return
+        lst = self._watches.setdefault(wd, [])
+        if source not in lst:
+            lst.append(source)
+
+    def _on_inotify(self):
+        for wd, mask, _name in self._ino.read_events():
+            for src in self._watches.get(wd, ()):
+                if src.changed is not None:
+                    src.changed.set()
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+
+    async def _run_source(self, src: LineSource):
+        try:
+            await src.run(self)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.emit(src.key, [f"[ERROR] {e}"])
+
+    def _thread_main(self):
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._ino = Inotify()
+            loop.add_reader(self._ino.fileno(), self._on_inotify)
+        except (OSError, AttributeError):
+            self._ino = None  # file sources fall back to ROTATE_CHECK polling
+        tasks = [loop.create_task(self._run_source(src)) for src in self.sources]
+        try:
+            loop.run_forever()
+        finally:
+            for t in tasks:
+                t.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            if self._ino is not None:
+                loop.remove_reader(self._ino.fileno())
+                self._ino.close()
+            loop.close()
+
+# ----------------------------
+# Compact line history
+# ----------------------------
+class LineRing:
+    """Lines stored as UTF-8 in one bytearray, oldest evicted first.
+
+    Each line is kept contiguous (with its trailing newline) and located by
+    an offsets/lengths ring, so append and evict are O(1) and the last N
+    lines can be sliced as memoryviews without copying. Capacity is a byte
+    budget rather than a line count; the buffer grows (doubling) up to it,
+    so idle files cost next to nothing.
+    """
+
+    def __init__(self, budget: int = SCROLLBACK_BYTES):
+        self.cap = max(64, budget)
+        self.buf = bytearray()
+        self._off = array.array("l", [0]) * 256
+        self._len = array.array("l", [0]) * 256
+        self._head = 0       # offsets-ring index of the oldest line
+        self._count = 0
+        self._wpos = 0       # next byte to write
+        self._tail = 0       # first byte of the oldest line
+        self._wrapped = False  # newest lines sit before the oldest in buf
+        self.evicted = 0
+        self.nbytes = 0      # payload bytes held (newlines included)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        for mv in self.views(0, self._count):
+            yield str(mv[:-1], "utf-8", "replace")
+
+    def clear(self):
+        self._head = self._count = self._wpos = self._tail = self.nbytes = 0
+        self._wrapped = False
+
+    def _evict(self):
+        n = len(self._off)
+        self.nbytes -= self._len[self._head]
+        self._head = (self._head + 1) % n
+        self._count -= 1
+        self.evicted += 1
+        if not self._count:
+            self.clear()
+            return
+        new_tail = self._off[self._head]
+        if new_tail < self._tail:
+            self._wrapped = False
+        self._tail = new_tail
+
+    def _grow_index(self):
+        n = len(self._off)
+        order = [(self._head + i) % n for i in range(self._count)]
+        off = array.array("l", (self._off[i] for i in order))
+        ln = array.array("l", (self._len[i] for i in order))
+        off.extend(array.array("l", [0]) * n)
+        ln.extend(array.array("l", [0]) * n)
+        self._off, self._len, self._head = off, ln, 0
+
+    def _grow_buf(self, need: int):
+        # a new buffer rather than a resize: views handed out stay valid
+        buf = bytearray(min(self.cap, max(need, 2 * len(self.buf), 4096)))
+        buf[:len(self.buf)] = self.buf
+        self.buf = buf
+
+    def append_bytes(self, data: bytes):
+        """Append one line (without newline) given as UTF-8 bytes."""
+        size = len(data) + 1
+        if size > self.cap:
+            data = data[:self.cap - 1]
+            size = self.cap
+        while True:
+            if not self._count:
+                pos = 0
+                break
+            if not self._wrapped:
+                if len(self.buf) - self._wpos >= size:
+                    pos = self._wpos
+                    break
+                if len(self.buf) < self.cap:
+                    self._grow_buf(self._wpos + size)
+                    continue
+                if self._tail >= size:
+                    pos = 0
+                    self._wrapped = True
+                    break
+            elif self._tail - self._wpos >= size:
+                pos = self._wpos
+                break
+            self._evict()
+        if self._count == len(self._off):
+            self._grow_index()
+        end = pos + size
+        if end > len(self.buf):
+            self._grow_buf(end)
+        self.buf[pos:end - 1] = data
+        self.buf[end - 1] = 10
+        i = (self._head + self._count) % len(self._off)
+        self._off[i] = pos
+        self._len[i] = size
+        if not self._count:
+            self._tail = pos
+        self._count += 1
+        self.nbytes += size
+        self._wpos = end
+
+    def append(self, line: str):
+        self.append_bytes(line.encode("utf-8", "replace"))
+
+    def extend(self, lines: List[str]):
+        append = self.append_bytes
+        for line in lines:
+            append(line.encode("utf-8", "replace"))
+
+    def views(self, start: int, stop: int) -> List[memoryview]:
+        """Zero-copy views (newline included) of lines start..stop, oldest = 0."""
+        start = max(0, start)
+        stop = min(self._count, stop)
+        mv = memoryview(self.buf)
+        n = len(self._off)
+        out = []
+        for k in range(start, stop):
+            i = (self._head + k) % n
+            o = self._off[i]
+            out.append(mv[o:o + self._len[i]])
+        return out
+
+    def line(self, k: int) -> str:
+        """The k-th held line, oldest = 0."""
+        i = (self._head + k) % len(self._off)
+        o = self._off[i]
+        return str(self.buf[o:o + self._len[i] - 1], "utf-8", "replace")
+
+    def last_views(self, n: int) -> List[memoryview]:
+        return self.views(self._count - n, self._count)
+
+    def last(self, n: int) -> List[str]:
+        return [str(mv[:-1], "utf-8", "replace") for mv in self.last_views(n)]
+
+    def text(self, n: int | None = None) -> str:
+        """The last n lines (all if None) joined with newlines, decoded once."""
+        views = self.last_views(self._count if n is None else n)
+        if not views:
+            return ""
+        return str(b"".join(views)[:-1], "utf-8", "replace")
+
+    def prepend(self, lines: List[str]):
+        """Put lines before the held ones, dropping the oldest to fit."""
+        ring = LineRing(self.cap)
+        ring.extend(lines)
+        for mv in self.views(0, self._count):
+            ring.append_bytes(bytes(mv[:-1]))
+        evicted = self.evicted
+        self.load(*ring.dump())
+        self.evicted = evicted
+
+    def dump(self) -> Tuple[array.array, bytes]:
+        """Line sizes (newline included) and payload, oldest first (--session)."""
+        views = self.views(0, self._count)
+        return array.array("I", map(len, views)), b"".join(views)
+
+    def load(self, sizes: array.array, payload: bytes):
+        """Replace the contents with dump() output, oldest lines dropped to fit."""
+        self.clear()
+        total, k = len(payload), 0
+        while total > self.cap:
+            total -= sizes[k]
+            k += 1
+        sizes = sizes[k:]
+        n = max(256, len(sizes))
+        self._off = array.array("l", accumulate(sizes[:-1], initial=0)) if sizes else array.array("l")
+        self._off.extend(array.array("l", [0]) * (n - len(self._off)))
+        self._len = array.array("l", sizes)
+        self._len.extend(array.array("l", [0]) * (n - len(self._len)))
+        if total > len(self.buf):
+            self._grow_buf(total)
+        self.buf[:total] = payload[len(payload) - total:]
+        self._count = len(sizes)
+        self._wpos = self.nbytes = total
+        self.evicted += k
+
+# ----------------------------
+# Search index
+# ----------------------------
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(line: str) -> List[str]:
+    return _TOKEN.findall(strip_markup(line).lower())
+
+
+class SearchIndex:
+    """Token -> line numbers, per file, over the lines held in the LineRings.
+
+    Line numbers are sequence numbers (ring.evicted + position), so postings
+    are appended in ascending order and entries for evicted lines are simply
+    below ring.evicted: queries skip them, prune() drops them in bulk.
+    """
+
+    def __init__(self):
+        self.files: Dict[str, Dict[str, array.array]] = {}
+        self.pruned: Dict[str, int] = {}
+
+    def add(self, path: str, first_seq: int, lines: List[str]):
+        idx = self.files.get(path)
+        if idx is None:
+            idx = self.files[path] = {}
+            self.pruned[path] = 0
+        seq = first_seq
+        for line in lines:
+            for tok in set(tokenize(line)):
+                post = idx.get(tok)
+                if post is None:
+                    post = idx[tok] = array.array("l")
+                post.append(seq)
+            seq += 1
+
+    def prune(self, path: str, min_seq: int):
+        """Forget postings for lines the ring has evicted (seq < min_seq)."""
+        idx = self.files.get(path)
+        if idx is None or self.pruned[path] >= min_seq:
+            return
+        for tok in list(idx):
+            post = idx[tok]
+            k = bisect_left(post, min_seq)
+            if k == len(post):
+                del idx[tok]
+            elif k:
+                del post[:k]
+        self.pruned[path] = min_seq
+
+    def remove(self, path: str):
+        self.files.pop(path, None)
+        self.pruned.pop(path, None)
+
+    def search(self, query: str, rings: Dict[str, LineRing],
+               limit: int = SEARCH_LIMIT) -> List[Tuple[str, int, str]]:
+        """(path, seq, line) for held lines containing query, newest first per file.
+
+        Every query token must be indexed for the line; the candidates are
+        then checked for the query as a substring, so "a-b" does not match a
+        line that only has "a" and "b" apart.
+        """
+        toks = set(tokenize(query))
+        needle = strip_markup(query).lower()
+        hits: List[Tuple[str, int, str]] = []
+        if not toks:
+            return hits
+        for path, idx in self.files.items():
+            ring = rings.get(path)
+            posts = [idx.get(t) for t in toks]
+            if ring is None or not all(posts):
+                continue
+            posts.sort(key=len)
+            lo = ring.evicted
+            first, rest = posts[0], posts[1:]
+            for i in range(len(first) - 1, -1, -1):
+                seq = first[i]
+                if seq < lo:
+                    break
+                if any(_missing(p, seq) for p in rest):
+                    continue
+                line = strip_markup(ring.line(seq - lo))
+                if needle in line.lower():
+                    hits.append((path, seq, line))
+                    if len(hits) >= limit:
+                        return hits
+        return hits
+
+
+def _missing(post: array.array, seq: int) -> bool:
+    k = bisect_left(post, seq)
+    return k == len(post) or post[k] != seq
+
+# ----------------------------
+# On-disk scrollback (mmap)
+# ----------------------------
+class FileScrollback:
+    """Page through a file's full history straight from an mmap.
+
+    Paging walks newlines with mmap.rfind/find, so only the page on screen is
+    ever decoded. A sparse index (newlines before each INDEX_BLOCK-byte block)
+    is built by a background thread, one block at a time, and only serves to
+    show "line X / Y"; paging works before it is done.
+    """
+
+    def __init__(self, path: str, page: int):
+        self.path = path
+        self.f = open(path, "rb")
+        self.mm: mmap.mmap | None = None
+        self.size = 0
+        self.block_lines = array.array("q", [0])  # newlines before block k
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.remap()
+        self.top = self.back(self.size, page)  # last page, i.e. the live view
+        self._indexer = threading.Thread(target=self._build_index, name="Scrollback-index", daemon=True)
+        self._indexer.start()
+
+    def remap(self):
+        """Pick up growth of the file since it was mapped."""
+        size = os.fstat(self.f.fileno()).st_size
+        if size == self.size and (self.mm is not None or size == 0):
+            return
+        with self._lock:
+            if self.mm is not None:
+                self.mm.close()
+            self.mm = mmap.mmap(self.f.fileno(), size, access=mmap.ACCESS_READ) if size else None
+            self.size = size
+
+    def close(self):
+        self._stop.set()
+        self._indexer.join(1.0)
+        with self._lock:
+            if self.mm is not None:
+                self.mm.close()
+                self.mm = None
+        self.f.close()
+
+    def _build_index(self):
+        while not self._stop.is_set():
+            with self._lock:
+                mm = self.mm
+                k = len(self.block_lines) - 1
+                a = k * INDEX_BLOCK
+                b = a + INDEX_BLOCK
+                if mm is None or b > self.size:
+                    break  # only whole blocks; the tail is counted on demand
+                n = mm[a:b].count(b"\n")
+            self.block_lines.append(self.block_lines[-1] + n)
+            time.sleep(0)  # yield the GIL between blocks
+
+    @property
+    def indexed_fraction(self) -> float:
+        full = self.size // INDEX_BLOCK
+        return 1.0 if not full else min(1.0, (len(self.block_lines) - 1) / full)
+
+    def line_number(self, off: int) -> int | None:
+        """Zero-based line number of the line starting at off, if indexed."""
+        k = off // INDEX_BLOCK
+        if k >= len(self.block_lines) or self.mm is None:
+            return None
+        a = k * INDEX_BLOCK
+        return self.block_lines[k] + self.mm[a:off].count(b"\n")
+
+    def total_lines(self) -> int | None:
+        return self.line_number(self.size) if self.indexed_fraction >= 1.0 else None
+
+    def back(self, off: int, n: int) -> int:
+        """Start of the line n lines before the line containing/starting at off."""
+        mm = self.mm
+        if mm is None:
+            return 0
+        # normalise off to the start of its line (EOF after a newline stays put)
+        if 0 < off < self.size or (off == self.size and off and mm[off - 1] != 10):
+            off = mm.rfind(b"\n", 0, off) + 1
+        for _ in range(n):
+            if off <= 0:
+                return 0
+            off = mm.rfind(b"\n", 0, off - 1) + 1
+        return off
+
+    def forward(self, off: int, n: int) -> int:
+        mm = self.mm
+        for _ in range(n):
+            if mm is None or off >= self.size:
+                break
+            nl = mm.find(b"\n", off)
+            off = self.size if nl == -1 else nl + 1
+        return off
+
+    def page(self, off: int, n: int) -> List[str]:
+        """Decode up to n lines starting at off."""
+        if self.mm is None:
+            return []
+        end = self.forward(off, n)
+        text = str(self.mm[off:end], "utf-8", "replace")
+        if text.endswith("\n"):
+            text = text[:-1]
+        return text.split("\n") if text else []
+
+    def page_up(self, n: int):
+        self.top = self.back(self.top, n)
+
+    def page_down(self, n: int) -> bool:
+        """Scroll down; False once the last page (live view) is reached."""
+        self.remap()
+        last = self.back(self.size, n)
+        self.top = min(self.forward(self.top, n), last)
+        return self.top < last
+
+    def status(self) -> str:
+        if not self.size:
+            return "history empty"
+        ln = self.line_number(self.top)
+        total = self.total_lines()
+        if ln is None or total is None:
+            return f"history, indexing {self.indexed_fraction * 100:.0f}%"
+        return f"history line {ln + 1}/{total}"
+
+# ----------------------------
+# Rotated (and compressed) history
+# ----------------------------
+_ROTATED_SUFFIX = re.compile(r"[.-][0-9][0-9.-]*(?:\.(?:gz|zst))?")
+
+
+def rotated_siblings(path: str) -> List[str]:
+    """Rotated copies of path (app.log.1, app.log.2.gz, app.log-20261018.zst, ...), oldest first."""
+    d, base = os.path.split(path)
+    found = []
+    try:
+        names = os.listdir(d or ".")
+    except OSError:
+        return []
+    for name in names:
+        if name.startswith(base) and _ROTATED_SUFFIX.fullmatch(name[len(base):]):
+            if name.endswith(".zst") and zstandard is None:
+                continue
+            p = os.path.join(d, name)
+            try:
+                found.append((os.stat(p).st_mtime, name, p))
+            except OSError:
+                pass
+    # mtime is when it stopped being written; break ties by name, .2 before .1
+    found.sort(key=lambda t: (t[0], [-int(x) for x in re.findall(r"\d+", t[1])]))
+    return [p for _, _, p in found]
+
+
+def rotated_copy_of(path: str, tailed) -> str | None:
+    """The path in tailed that path is a rotated copy of (app.log.1 -> app.log), or None."""
+    d, name = os.path.split(path)
+    for i in range(1, len(name)):
+        if name[i] in ".-" and _ROTATED_SUFFIX.fullmatch(name, i):
+            base = os.path.join(d, name[:i])
+            if base in tailed:
+                return base
+    return None
+
+
+def new_decoder(path: str):
+    """Incremental decompressor for path, or None for an uncompressed file.
+
+    Both kinds stop at the end of a gzip member / zstd frame and keep what
+    follows in .unused_data; the caller starts a new decoder there.
+    """
+    if path.endswith(".gz"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ValueError("reading .zst needs the zstandard module")
+        return zstandard.ZstdDecompressor().decompressobj()
+    return None
+
+
+def iter_decoded(path: str, f, decoder, chunk: int = READ_SIZE):
+    """Decode f from its position: yields (input offset after chunk, output, decoder)."""
+    while True:
+        data = f.read(chunk)
+        if not data:
+            return
+        pos = f.tell()
+        while data:
+            out = decoder.decompress(data)
+            data = b""
+            if decoder.eof:
+                data = decoder.unused_data
+                if not data.strip(b"\0"):
+                    data = b""  # trailing padding
+                else:
+                    decoder = new_decoder(path)
+            yield pos - len(data), out, decoder
+
+
+def history_tail(path: str, n: int, max_decoded: int = BACKFILL_DECODE_MAX) -> List[str]:
+    """Up to n last lines of path's rotated copies, newest copy read first.
+
+    A compressed copy that decodes to more than max_decoded bytes ends the
+    walk with a note instead (PageUp still reaches it).
+    """
+    out: List[str] = []
+    for sib in reversed(rotated_siblings(path)):
+        need = n - len(out)
+        if need <= 0:
+            break
+        try:
+            dec = new_decoder(sib)
+            if dec is None:
+                lines = tail_lines(sib, need)[0]
+            else:
+                # no way to read a compressed stream backwards: decode it
+                # all, keeping only the last lines
+                keep: deque = deque(maxlen=need)
+                splitter = LineSplitter()
+                decoded = 0
+                with open(sib, "rb") as f:
+                    for _, data, _ in iter_decoded(sib, f, dec):
+                        decoded += len(data)
+                        if decoded > max_decoded:
+                            break
+                        keep.extend(splitter.feed(data, len(data)))
+                if decoded > max_decoded:
+                    out[:0] = [f"[history: {os.path.basename(sib)} is over "
+                               f"{max_decoded >> 20} MiB decoded; PageUp to read it]"]
+                    break
+                if splitter.partial:
+                    keep.append(str(splitter.partial, "utf-8", "replace"))
+                lines = list(keep)
+        except (OSError, ValueError, zlib.error) as e:
+            lines = [f"[ERROR reading {sib}: {e}]"]
+        out[:0] = lines
+    return out[-n:] if n > 0 else []
+
+
+class ArchiveReader:
+    """Random access to the decoded bytes of a rotated log, without unpacking it.
+
+    A background pass decodes the archive once, counting newlines per
+    INDEX_BLOCK (like FileScrollback) and recording seek points: the start
+    of every gzip member / zstd frame, plus for gzip a copy of the decoder
+    every ARCHIVE_SEEK_SPAN bytes. Reads decode ARCHIVE_WINDOW-aligned
+    windows from the nearest seek point; a few windows are cached. Once
+    done, it quacks like the mmap FileScrollback pages through (len,
+    indexing, slicing, find, rfind).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.csize = os.path.getsize(path)
+        new_decoder(path)  # raises early for unsupported formats
+        self.size = 0       # decoded size, final once done
+        self.consumed = 0   # compressed bytes decoded by the index pass
+        self.done = False
+        self.error = ""
+        self.block_lines = array.array("q", [0])
+        self._seek_out = [0]                         # decoded offset of seek point k
+        self._seeks: List[Tuple[int, object]] = [(0, None)]  # (input offset, decoder copy or None)
+        self._windows: Dict[int, bytes] = {}
+        self._f = open(path, "rb")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._index, name="Archive-index", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(1.0)
+        self._f.close()
+
+    # -- index pass (background thread) --
+    def _index(self):
+        out_off = 0
+        block_nl = 0
+        dec = new_decoder(self.path)
+        try:
+            with open(self.path, "rb") as f:
+                for in_off, out, nxt in iter_decoded(self.path, f, dec):
+                    if self._stop.is_set():
+                        return
+                    # newline counts per INDEX_BLOCK of output
+                    pos = 0
+                    while pos < len(out):
+                        room = INDEX_BLOCK - (out_off + pos) % INDEX_BLOCK
+                        part = out[pos:pos + room]
+                        block_nl += part.count(b"\n")
+                        pos += len(part)
+                        if (out_off + pos) % INDEX_BLOCK == 0:
+                            self.block_lines.append(self.block_lines[-1] + block_nl)
+                            block_nl = 0
+                    out_off += len(out)
+                    if nxt is not dec:
+                        self._seek_out.append(out_off)
+                        self._seeks.append((in_off, None))  # fresh decoder at a member/frame start
+                        dec = nxt
+                    elif out_off - self._seek_out[-1] >= ARCHIVE_SEEK_SPAN and hasattr(dec, "copy"):
+                        self._seek_out.append(out_off)
+                        self._seeks.append((in_off, dec.copy()))
+                    self.consumed = in_off
+                    time.sleep(0)  # yield the GIL between chunks
+        except (OSError, ValueError, zlib.error) as e:
+            self.error = str(e)
+        self.size = out_off
+        self.consumed = self.csize
+        self.done = True
+
+    @property
+    def fraction(self) -> float:
+        return 1.0 if self.done else self.consumed / max(1, self.csize)
+
+    # -- reads (render thread) --
+    def window(self, w: int) -> bytes:
+        data = self._windows.pop(w, None)
+        if data is None:
+            data = self._decode(w * ARCHIVE_WINDOW, min(self.size, (w + 1) * ARCHIVE_WINDOW))
+            if len(self._windows) >= ARCHIVE_CACHE_WINDOWS:
+                del self._windows[next(iter(self._windows))]
+        self._windows[w] = data  # most recently used last
+        return data
+
+    def _decode(self, a: int, b: int) -> bytes:
+        k = bisect_right(self._seek_out, a) - 1
+        in_off, state = self._seeks[k]
+        out_off = self._seek_out[k]
+        dec = state.copy() if state is not None else new_decoder(self.path)
+        self._f.seek(in_off)
+        parts = []
+        for _, out, dec in iter_decoded(self.path, self._f, dec):
+            lo, hi = max(a - out_off, 0), min(b - out_off, len(out))
+            if hi > lo:
+                parts.append(out[lo:hi])
+            out_off += len(out)
+            if out_off >= b:
+                break
+        return b"".join(parts)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            a = max(0, k.start or 0)
+            b = min(self.size, self.size if k.stop is None else k.stop)
+            parts = []
+            while a < b:
+                w = a // ARCHIVE_WINDOW
+                base = w * ARCHIVE_WINDOW
+                data = self.window(w)
+                parts.append(data[a - base:b - base])
+                a = base + ARCHIVE_WINDOW
+            return b"".join(parts)
+        return self.window(k // ARCHIVE_WINDOW)[k % ARCHIVE_WINDOW]
+
+    def find(self, sub: bytes, start: int = 0) -> int:
+        pos = start
+        while pos < self.size:
+            w = pos // ARCHIVE_WINDOW
+            base = w * ARCHIVE_WINDOW
+            i = self.window(w).find(sub, pos - base)
+            if i != -1:
+                return base + i
+            pos = base + ARCHIVE_WINDOW
+        return -1
+
+    def rfind(self, sub: bytes, lo: int, hi: int) -> int:
+        pos = min(hi, self.size)
+        while pos > lo:
+            w = (pos - 1) // ARCHIVE_WINDOW
+            base = w * ARCHIVE_WINDOW
+            i = self.window(w).rfind(sub, max(lo - base, 0), pos - base)
+            if i != -1:
+                return base + i
+            pos = base
+        return -1
+
+
+class ArchiveScrollback(FileScrollback):
+    """FileScrollback over a compressed rotated copy (via ArchiveReader).
+
+    Pages are available once the reader's index pass is done (ready).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.reader = ArchiveReader(path)
+        self.mm = None
+        self.size = 0
+        self.block_lines = self.reader.block_lines
+        self.top = 0
+
+    @property
+    def ready(self) -> bool:
+        if self.mm is None and self.reader.done:
+            self.mm = self.reader
+            self.size = self.reader.size
+        return self.mm is not None
+
+    def remap(self):
+        pass  # archives do not grow
+
+    def close(self):
+        self.reader.close()
+
+    @property
+    def indexed_fraction(self) -> float:
+        return self.reader.fraction
+
 
-    def __init__(self, path: str, out_q: "queue.Queue[Tuple[str,str]]"):
-        super().__init__(name=f"Tail-{os.path.basename(path)}")
+class HistoryScrollback:
+    """A file's history across rotations: its rotated copies, oldest first,
+    then the live file. Paging up past the top of one continues on the last
+    page of the copy before it; plain copies are mmapped like the live
+    file, compressed ones are decoded on demand (ArchiveScrollback), and
+    only indexed once paging reaches them.
+    """
+
+    def __init__(self, path: str, page: int):
         self.path = path
-        self.q = out_q
-        self._stop = threading.Event()
+        self.live = FileScrollback(path, page)
+        self.paths: List[str] = []
+        self.segments: List[FileScrollback | None] = []  # None: archive not opened yet
+        for sib in rotated_siblings(path):
+            try:
+                seg = None if new_decoder(sib) is not None else FileScrollback(sib, page)
+            except (OSError, ValueError) as e:
+                print(f"[WARN] history: skipping {sib}: {e}")
+                continue
+            self.paths.append(sib)
+            self.segments.append(seg)
+        self.paths.append(path)
+        self.segments.append(self.live)
+        self.seg = len(self.segments) - 1
 
-    def run(self):
-        try:
-            for line in follow_file(self.path):
-                if self._stop.is_set():
-                    break
-                self.q.put((self.path, line))
-        except Exception as e:
-            self.q.put((self.path, f"[ERROR] {e}"))
+    def _open(self, k: int) -> FileScrollback | None:
+        """Segment k, opening (and starting to index) an archive on first use."""
+        seg = self.segments[k]
+        if seg is None:
+            try:
+                seg = self.segments[k] = ArchiveScrollback(self.paths[k])
+            except (OSError, ValueError) as e:
+                print(f"[WARN] history: skipping {self.paths[k]}: {e}")
+                del self.segments[k], self.paths[k]
+                if k < self.seg:
+                    self.seg -= 1
+        return seg
 
-    def stop(self):
-        self._stop.set()
+    @staticmethod
+    def _ready(seg: FileScrollback | None) -> bool:
+        return seg is not None and getattr(seg, "ready", True)
+
+    @property
+    def top(self) -> Tuple[int, int]:
+        return self.seg, self.segments[self.seg].top
+
+    def page(self, top: Tuple[int, int], n: int) -> List[str]:
+        k, off = top
+        return self.segments[k].page(off, n)
+
+    def page_up(self, n: int):
+        cur = self.segments[self.seg]
+        if cur.top > 0:
+            cur.page_up(n)
+        elif self.seg > 0 and self._ready(self._open(self.seg - 1)):
+            self.seg -= 1
+            prev = self.segments[self.seg]
+            prev.top = prev.back(prev.size, n)
+
+    def page_down(self, n: int) -> bool:
+        """Scroll down; False once the live file's last page is reached."""
+        cur = self.segments[self.seg]
+        if cur is self.live:
+            return cur.page_down(n)
+        last = cur.back(cur.size, n)
+        if cur.top >= last:
+            self.seg += 1
+            self.segments[self.seg].top = 0
+            return True
+        cur.top = min(cur.forward(cur.top, n), last)
+        return True
+
+    @property
+    def indexed_fraction(self) -> float:
+        return min(seg.indexed_fraction for seg in self.segments if seg is not None)
+
+    def status(self) -> str:
+        cur = self.segments[self.seg]
+        text = cur.status()
+        if cur is not self.live:
+            text = f"{os.path.basename(cur.path)}: {text}"
+        if cur.top == 0 and self.seg > 0:
+            prev = self.segments[self.seg - 1]
+            if prev is not None and not self._ready(prev):
+                text += f"; {os.path.basename(prev.path)} indexing {prev.indexed_fraction * 100:.0f}%"
+            elif self.seg == len(self.segments) - 1 and len(self.segments) > 1:
+                text += f"; {len(self.segments) - 1} rotated copies above"
+        return text
+
+    def close(self):
+        for seg in self.segments:
+            if seg is not None:
+                seg.close()
+
+# ----------------------------
+# Session snapshot (--session)
+# ----------------------------
+def write_session(path: str, state: dict, rings: List[Tuple[array.array, bytes]]):
+    """Write a snapshot atomically: magic, JSON header length and header, then
+    per file (in state["files"] order) its line sizes and payload, raw.
+    """
+    header = json.dumps(state).encode()
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(SESSION_MAGIC + struct.pack("<I", len(header)) + header)
+        for sizes, payload in rings:
+            f.write(sizes.tobytes())
+            f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_session(path: str) -> Tuple[dict, Dict[str, Tuple[array.array, bytes]]]:
+    """The state written by write_session and each file's (sizes, payload)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(SESSION_MAGIC):
+        raise ValueError("not a session snapshot")
+    at = len(SESSION_MAGIC) + 4
+    (hlen,) = struct.unpack_from("<I", data, len(SESSION_MAGIC))
+    state = json.loads(data[at:at + hlen])
+    at += hlen
+    rings = {}
+    with memoryview(data) as mv:
+        for entry in state["files"]:
+            sizes = array.array("I")
+            sizes.frombytes(mv[at:at + entry["lines"] * sizes.itemsize])
+            at += entry["lines"] * sizes.itemsize
+            rings[entry["path"]] = (sizes, bytes(mv[at:at + entry["bytes"]]))
+            at += entry["bytes"]
+    if at != len(data):
+        raise ValueError("truncated session snapshot")
+    return state, rings
 
 # ----------------------------
 # Panel class
 # ----------------------------
+class PanelRecord:
+    """What a file keeps while its panel has no scene nodes (virtualized)."""
+    __slots__ = ("path", "title", "index", "lines", "skipped", "activity", "latency", "log_latency")
+
+    def __init__(self, path: str, index: int, scrollback_bytes: int = SCROLLBACK_BYTES):
+        self.path = path
+        self.title = os.path.basename(path)
+        self.index = index
+        self.lines = LineRing(scrollback_bytes)
+        self.skipped = 0
+        self.activity = 0.0
+        self.latency = LatencyStats()      # read -> setText
+        self.log_latency = LatencyStats()  # embedded log timestamp -> setText
+
+    def extend_lines(self, lines: List[str], skipped: int = 0):
+        self.lines.extend(lines)
+        self.skipped += skipped
+        self.activity += len(lines)
+
+def load_font(font_path: str | None):
+    """Load font_path (or DEFAULT_FONT); None if neither loads."""
+    try:
+        font = FontPool.loadFont(font_path if font_path and os.path.exists(font_path) else DEFAULT_FONT)
+        return font or None
+    except Exception:
+        # ignore font load errors
+        return None
+
+
+_CARDS: Dict[Tuple[float, float], "NodePath"] = {}
+
+
+def shared_card(width: float, height: float):
+    """One card geometry per size, instanced under every panel."""
+    card = _CARDS.get((width, height))
+    if card is None:
+        cm = CardMaker(f"card-{width}x{height}")
+        cm.setFrame(-width/2, width/2, -height/2, height/2)
+        card = _CARDS[(width, height)] = NodePath(cm.generate())
+    return card
+
+def lod_for_distance(d: float) -> int:
+    if d < LOD_FULL_DIST:
+        return LOD_FULL
+    if d < LOD_TAIL_DIST:
+        return LOD_TAIL
+    if d < LOD_BAR_DIST:
+        return LOD_BAR
+    return LOD_CARD
+
 class LogPanel:
+    profiler: Profiler | None = None  # set by App; times text regeneration
+
     def __init__(self, parent, title: str, position: Point3, width: float = PANEL_WIDTH,
-                 height: float = PANEL_HEIGHT, max_lines: int = PANEL_MAX_LINES, font_path: str | None = None):
+                 height: float = PANEL_HEIGHT, max_lines: int = PANEL_MAX_LINES, font_path: str | None = None,
+                 font=None, record: PanelRecord | None = None,
+                 scrollback_bytes: int = SCROLLBACK_BYTES):
         self.title = title
+        self.font = font if font is not None else load_font(font_path)
         self.node = parent.attachNewNode(f"panel-{title}")
         self.node.setPos(position)
+        # world-space box of the card (panels never move), for visibility tests
+        self.bounds = BoundingBox(Point3(position.x - width/2, position.y - 0.1, position.z - height/2),
+                                  Point3(position.x + width/2, position.y + 0.1, position.z + height/2))
+        self.visible = True
+        self.lod = LOD_FULL
+        self.width = width
+        self.height = height
 
-        # background card
-        cm = CardMaker(f"card-{title}")
-        cm.setFrame(-width/2, width/2, -height/2, height/2)
-        card = self.node.attachNewNode(cm.generate())
-        card.setColor(0.06, 0.06, 0.07, 1)
-        card.setTwoSided(True)
+        # background card (shared geometry; color/state live on the holder)
+        self.card_np = self.node.attachNewNode(f"card-{title}")
+        shared_card(width, height).instanceTo(self.card_np)
+        self.card_np.setColor(*CARD_COLOR)
+        self.heat = 0.0
+        self.card_np.setTwoSided(True)
 
         # title
         tnode = TextNode(f"title-{title}")
@@ -162,6 +3056,13 @@ class LogPanel:
         #tnode.setTextColor(0.9, 0.9, 0.95, 1)
         tnode.setTextColor(1.0, 1.0, 0.2, 1)
         tnode.setAlign(TextNode.ALeft)
+        self.title_node = tnode
+        self.skipped = 0
+        self.status = ""
+        self.counters = ""  # filter/highlight match counts
+        self.rate = ""      # ingest rate badge
+        self.lag = ""       # display latency badge
+        self.frozen = False  # showing scrollback; live updates wait
         title_np = self.node.attachNewNode(tnode)
         title_np.setPos(-width/2 + 0.18, 0.02, height/2 - 0.35)
         title_np.setScale(0.12)
@@ -170,26 +3071,37 @@ class LogPanel:
         title_np.setDepthWrite(False)
         title_np.setBin("fixed", 80)
 
+        self.body_np = self._make_body(width, height, font_path)
+
+        # a record's LineRing is shared, not copied, so lines survive release()
+        self.record = record
+        self.max_lines = max_lines
+        self.lines = record.lines if record is not None else LineRing(scrollback_bytes)
+        self.dirty = bool(self.lines)
+
+        # display latency: read time (monotonic) and embedded log time (epoch)
+        # of the oldest batch not yet drawn, recorded when refresh() draws it
+        self.latency = record.latency if record is not None else LatencyStats()
+        self.log_latency = record.log_latency if record is not None else LatencyStats()
+        self.stamp: float | None = None
+        self.log_stamp: float | None = None
+
+        # activity bar for distant panels (created on first use)
+        self.activity = record.activity if record is not None else 0.0
+        self.bar_np = None
+        if record is not None and record.skipped:
+            self.add_skipped(record.skipped)
+
+    def _make_body(self, width: float, height: float, font_path: str | None):
         # text node (monospace if possible)
-        self.text_node = TextNode(f"text-{title}")
+        self.text_node = TextNode(f"text-{self.title}")
         self.text_node.setTextColor(0.92, 0.92, 0.95, 1)
         self.text_node.setAlign(TextNode.ALeft)
         # variable wordwrap depending on width (heuristic)
         self.text_node.setWordwrap(int(width * 10))
 
-        # load font if available (safe)
-        try:
-            if font_path and os.path.exists(font_path):
-                font = FontPool.loadFont(font_path)
-                if font:
-                    self.text_node.setFont(font)
-            else:
-                font = FontPool.loadFont("/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf")
-                if font:
-                    self.text_node.setFont(font)
-        except Exception:
-            # ignore font load errors
-            pass
+        if self.font:
+            self.text_node.setFont(self.font)
 
         self.text_np = self.node.attachNewNode(self.text_node)
         # slightly in front of card to avoid z-fight while still visually "on" it
@@ -203,32 +3115,467 @@ class LogPanel:
         self.text_np.setTwoSided(True)
         self.text_np.setTransparency(True)
         self.text_np.setBin("fixed", 50)
-
-        self.lines = deque(maxlen=max_lines)
+        return self.text_np
 
     def append_line(self, line: str):
         if line is None:
             return
-        self.lines.append(line)
-        self.text_node.setText("\n".join(self.lines))
+        self.extend_lines([line])
+        self.refresh()
+
+    def extend_lines(self, lines: List[str]):
+        """Queue lines for display; text is rebuilt on the next refresh()."""
+        if lines:
+            self.lines.extend(lines)
+            self.activity += len(lines)
+            self.dirty = True
+
+    def refresh(self) -> bool:
+        """Rebuild what the current LOD shows; deferred while off-screen."""
+        if not (self.dirty and self.visible) or self.lod == LOD_CARD or self.frozen:
+            return False
+        prof = self.profiler
+        t0 = time.perf_counter() if prof is not None else 0.0
+        if self.lod == LOD_BAR:
+            self._update_bar()
+        else:
+            self._render_text()
+        if prof is not None:
+            prof.add("text-regen", t0, time.perf_counter())
+        if self.stamp is not None:
+            self.latency.add(time.monotonic() - self.stamp)
+            self.stamp = None
+        if self.log_stamp is not None:
+            self.log_latency.add(time.time() - self.log_stamp)
+            self.log_stamp = None
+        self.dirty = False
+        return True
+
+    def stamp_batch(self, read_time: float, log_time: float | None = None):
+        """Note when the oldest batch waiting to be drawn was read (and logged).
+
+        Only on-screen panels are timed: a panel that is culled or showing
+        scrollback defers drawing on purpose, which is not lag.
+        """
+        if not self.visible or self.frozen:
+            return
+        if self.stamp is None and read_time:
+            self.stamp = read_time
+        if self.log_stamp is None:
+            self.log_stamp = log_time
+
+    def _drop_stamps(self):
+        self.stamp = self.log_stamp = None
+
+    def _render_text(self):
+        n = self.max_lines if self.lod == LOD_FULL else LOD_TAIL_LINES
+        self.text_node.setText(self.lines.text(n))
+
+    def set_lod(self, lod: int):
+        if lod == self.lod:
+            return
+        self.lod = lod
+        if lod in (LOD_FULL, LOD_TAIL):
+            self.body_np.show()
+        else:
+            self.body_np.hide()
+        if self.bar_np is not None:
+            if lod == LOD_BAR:
+                self.bar_np.show()
+            else:
+                self.bar_np.hide()
+        self.dirty = True
+        self.refresh()
+
+    def decay_activity(self, factor: float = 0.5):
+        """Age the activity counter; redraws the bar if it is shown."""
+        if self.activity:
+            self.activity *= factor
+            if self.activity < 0.5:
+                self.activity = 0.0
+            if self.lod == LOD_BAR:
+                self.dirty = True
+
+    def _update_bar(self):
+        if self.bar_np is None:
+            cm = CardMaker(f"bar-{self.title}")
+            cm.setFrame(0, self.width, -0.6, 0.6)
+            self.bar_np = self.node.attachNewNode(cm.generate())
+            self.bar_np.setPos(-self.width/2, -0.03, -self.height/2 + 1.0)
+            self.bar_np.setColor(1.0, 0.55, 0.1, 1)
+            self.bar_np.setTwoSided(True)
+            self.bar_np.setLightOff()
+        level = min(1.0, self.activity / ACTIVITY_FULL)
+        self.bar_np.setSx(max(0.002, level))
+        self.bar_np.setColor(0.2 + 0.8 * level, 0.55 * (1.0 - level) + 0.2, 0.1, 1)
+
+    def set_visible(self, visible: bool):
+        self.visible = visible
+        if visible:
+            self.refresh()
+        else:
+            self._drop_stamps()
+
+    def release(self):
+        """Drop scene nodes; lines and counters stay in the record."""
+        if self.record is not None:
+            self.record.skipped = self.skipped
+            self.record.activity = self.activity
+        self.node.removeNode()
+
+    def add_skipped(self, n: int):
+        """Count lines dropped by the ingest buffer and show it in the title."""
+        if n > 0:
+            self.skipped += n
+            self._update_title()
+
+    def set_status(self, status: str):
+        self.status = status
+        self._update_title()
+
+    def set_counters(self, counters: str):
+        if counters != self.counters:
+            self.counters = counters
+            self._update_title()
+
+    def set_lag(self, badge: str):
+        if badge != self.lag:
+            self.lag = badge
+            self._update_title()
+
+    def set_rate(self, badge: str):
+        if badge != self.rate:
+            self.rate = badge
+            self._update_title()
+
+    def set_heat(self, level: float):
+        """Tint the card from CARD_COLOR (0.0) towards HEAT_COLOR (1.0)."""
+        level = round(level, 2)
+        if level == self.heat:
+            return
+        self.heat = level
+        self.card_np.setColor(*(c + (h - c) * level for c, h in zip(CARD_COLOR, HEAT_COLOR)))
+
+    def _update_title(self):
+        text = self.title
+        if self.rate:
+            text += f"  [{self.rate}]"
+        if self.lag:
+            text += f"  [{self.lag}]"
+        if self.skipped:
+            text += f"  [{self.skipped} lines skipped]"
+        if self.counters:
+            text += f"  [{self.counters}]"
+        if self.status:
+            text += f"  [{self.status}]"
+        self.title_node.setText(text)
+
+    # -- scrollback: a page of history replaces the live view --
+    @property
+    def page_lines(self) -> int:
+        return self.max_lines
+
+    def show_page(self, lines: List[str], status: str):
+        self.frozen = True
+        self._drop_stamps()
+        self.text_node.setText("\n".join(lines))
+        self.set_status(status)
+
+    def resume_live(self):
+        self.frozen = False
+        self.set_status("")
+        self.dirty = True
+        self.refresh()
+
+    def reload(self):
+        """Redraw from the ring after lines were put before the ones shown."""
+        self.dirty = True
+        self.refresh()
+
+# ----------------------------
+# Glyph atlas panel (render-to-texture)
+# ----------------------------
+class GlyphAtlas:
+    """Pre-rendered monospace ASCII glyphs as 8-bit rows, shared by all panels.
+
+    rows[y][b] is the y-th texel row (top-down) of the glyph for byte b; bytes
+    outside printable ASCII map to "?".
+    """
+    _cache: Dict[Tuple[str, int], "GlyphAtlas"] = {}
+
+    def __init__(self, font_path: str, pixel_size: int = ATLAS_PIXEL_SIZE):
+        tm = PNMTextMaker(Filename.fromOsSpecific(font_path), 0)
+        if not tm.isValid():
+            raise ValueError(f"cannot load font {font_path}")
+        tm.setPixelSize(pixel_size)
+        tm.setFg((1, 1, 1, 1))
+        self.cw = max(1, tm.calcWidth("M"))
+        self.ch = max(1, int(ceil(tm.getLineHeight() * pixel_size)))
+        baseline = self.ch - int(ceil(pixel_size * 0.25))
+        blank = bytes(self.cw)
+        glyphs: Dict[int, List[bytes]] = {}
+        for code in range(32, 127):
+            img = PNMImage(self.cw, self.ch, 1, 255)
+            tm.generateInto(chr(code), img, 0, baseline)
+            glyphs[code] = [bytes(img.getGrayVal(x, y) for x in range(self.cw))
+                            for y in range(self.ch)]
+        qmark = glyphs[ord("?")]
+        self.rows: List[List[bytes]] = []
+        for y in range(self.ch):
+            row = [glyphs[b][y] if b in glyphs else qmark[y] for b in range(256)]
+            row[ord(" ")] = blank
+            self.rows.append(row)
+
+    @classmethod
+    def get(cls, font_path: str, pixel_size: int = ATLAS_PIXEL_SIZE) -> "GlyphAtlas":
+        key = (font_path, pixel_size)
+        atlas = cls._cache.get(key)
+        if atlas is None:
+            atlas = cls._cache[key] = cls(font_path, pixel_size)
+        return atlas
+
+
+class AtlasLogPanel(LogPanel):
+    """LogPanel whose body is a texture holding a ring of text rows.
+
+    Appending a line blits one row of glyphs into the texture and moves the
+    V texture offset; nothing else is regenerated. Lines longer than
+    ATLAS_COLS are cut rather than wrapped.
+    """
+
+    def _make_body(self, width: float, height: float, font_path: str | None):
+        self.atlas = GlyphAtlas.get(font_path if font_path and os.path.exists(font_path) else DEFAULT_FONT)
+        body_w = width - 0.36
+        body_h = height - 0.9
+        self.cols = ATLAS_COLS
+        tex_w = self.cols * self.atlas.cw
+        # as many rows as fit the body at the glyph aspect ratio
+        self.rows = max(1, int(body_h / (body_w / tex_w) / self.atlas.ch))
+        tex_h = self.rows * self.atlas.ch
+        self.tex = Texture(f"atlas-{self.title}")
+        self.tex.setup2dTexture(tex_w, tex_h, Texture.T_unsigned_byte, Texture.F_alpha)
+        self.tex.setWrapU(Texture.WM_clamp)
+        self.tex.setWrapV(Texture.WM_repeat)
+        self.tex.setMinfilter(Texture.FT_linear)
+        self.tex.setMagfilter(Texture.FT_linear)
+        self.tex.setRamImage(bytes(tex_w * tex_h))
+        self.pending: deque = deque(maxlen=self.rows)
+        self.written = 0  # total rows written; next slot is written % rows
+
+        cm = CardMaker(f"body-{self.title}")
+        cm.setFrame(-body_w/2, body_w/2, -body_h/2, body_h/2)
+        np_ = self.node.attachNewNode(cm.generate())
+        np_.setPos(0, -0.02, -0.3)
+        np_.setTexture(self.tex)
+        np_.setColor(0.92, 0.92, 0.95, 1)
+        np_.setTransparency(TransparencyAttrib.M_alpha)
+        np_.setDepthWrite(False)
+        np_.setLightOff()
+        np_.setTwoSided(True)
+        np_.setBin("fixed", 50)
+        return np_
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending.extend(self.lines.last(self.rows))
+
+    def extend_lines(self, lines: List[str]):
+        if lines:
+            self.pending.extend(lines)
+        super().extend_lines(lines)
+
+    def _render_text(self):
+        # LOD_TAIL makes no difference here: a row costs the same near or far
+        if not self.pending:
+            return
+        rows, ch, cols = self.rows, self.atlas.ch, self.cols
+        stride = cols * self.atlas.cw
+        tex_h = rows * ch
+        mv = memoryview(self.tex.modifyRamImage())
+        glyph_rows = self.atlas.rows
+        while self.pending:
+            line = strip_markup(self.pending.popleft())  # no inline colors here
+            data = line.expandtabs(4).encode("ascii", "replace")[:cols].ljust(cols)
+            slot = self.written % rows
+            # texture rows are stored bottom-up; slot 0 is the top line
+            top = tex_h - 1 - slot * ch
+            for y in range(ch):
+                off = (top - y) * stride
+                mv[off:off + stride] = b"".join(map(glyph_rows[y].__getitem__, data))
+            self.written += 1
+        mv.release()
+        start = self.written % rows if self.written >= rows else 0
+        self.body_np.setTexOffset(TextureStage.getDefault(), 0, -start / rows)
+
+    @property
+    def page_lines(self) -> int:
+        return self.rows
+
+    def _fill(self, lines: List[str]):
+        """Rewrite every row: blank rows first, then lines at the bottom."""
+        lines = lines[-self.rows:]
+        self.pending.clear()
+        self.pending.extend([""] * (self.rows - len(lines)) + lines)
+        self._render_text()
+
+    def show_page(self, lines: List[str], status: str):
+        self.frozen = True
+        self._drop_stamps()
+        self._fill(lines)
+        self.set_status(status)
+
+    def resume_live(self):
+        self.frozen = False
+        self.set_status("")
+        self._fill(self.lines.last(self.rows))
+        self.dirty = False
+
+    def reload(self):
+        if not self.frozen:
+            self._fill(self.lines.last(self.rows))
+
+# ----------------------------
+# Profiling
+# ----------------------------
+_SPARK = " ▁▂▃▄▅▆▇█"
+
+
+class Profiler:
+    """Per-frame time of named sections, with rolling histograms and a trace.
+
+    wrap() times a task function, add() any span measured by the caller.
+    end_frame() (a late task) closes the frame: each section's total for the
+    frame goes into a PROFILE_WINDOW ring, from which the HUD shows
+    percentiles and a histogram over PROFILE_BUCKETS_MS. With trace=True,
+    every span is also kept for dump_trace() (Chrome trace event format,
+    open in chrome://tracing or Perfetto).
+    """
+
+    def __init__(self, window: int = PROFILE_WINDOW, trace: bool = False):
+        self.window = window
+        self.frame: Dict[str, float] = {}
+        self.hist: Dict[str, deque] = {}
+        self.trace: deque | None = deque(maxlen=PROFILE_TRACE_EVENTS) if trace else None
+        self._t0 = time.perf_counter()
+        self._frame_start = self._t0
+
+    def add(self, name: str, t0: float, t1: float):
+        self.frame[name] = self.frame.get(name, 0.0) + (t1 - t0) * 1000.0
+        if self.trace is not None:
+            self.trace.append((name, t0, t1 - t0))
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        def timed(*args):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.add(name, t0, time.perf_counter())
+        return timed
+
+    def end_frame(self):
+        now = time.perf_counter()
+        frame = self.frame
+        frame["frame"] = (now - self._frame_start) * 1000.0
+        self._frame_start = now
+        for name in frame.keys() - self.hist.keys():
+            self.hist[name] = deque(maxlen=self.window)
+        for name, ring in self.hist.items():
+            ring.append(frame.get(name, 0.0))
+        self.frame = {}
+
+    def summary(self) -> str:
+        rows = [f"{'section':16s} {'p50':>6s} {'p95':>6s} {'p99':>6s} {'max':>6s} ms  "
+                f"histogram {PROFILE_BUCKETS_MS[0]}..{PROFILE_BUCKETS_MS[-1]}+ ms"]
+        for name in sorted(self.hist, key=lambda n: (n != "frame", n)):
+            ring = sorted(self.hist[name])
+            if not ring:
+                continue
+            counts = [0] * (len(PROFILE_BUCKETS_MS) + 1)
+            for v in ring:
+                counts[bisect_left(PROFILE_BUCKETS_MS, v)] += 1
+            top = max(counts)
+            spark = "".join(_SPARK[ceil(c * (len(_SPARK) - 1) / top)] for c in counts)
+            rows.append(f"{name:16s} {percentile(ring, 50):6.2f} {percentile(ring, 95):6.2f} "
+                        f"{percentile(ring, 99):6.2f} {ring[-1]:6.2f}     |{spark}|")
+        return "\n".join(rows)
+
+    def dump_trace(self, path: str) -> int:
+        """Write the kept spans as Chrome trace JSON; returns the event count."""
+        events = [{"name": name, "ph": "X", "pid": os.getpid(), "tid": 1,
+                   "ts": round((t0 - self._t0) * 1e6, 1), "dur": round(dur * 1e6, 1)}
+                  for name, t0, dur in (self.trace or ())]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100.0))
+    return sorted_values[k]
+
+
+class LatencyStats:
+    """The last LATENCY_WINDOW latency samples (seconds), for p50/p99."""
+    __slots__ = ("samples",)
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples: deque = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def quantiles_ms(self) -> Tuple[float, float] | None:
+        return quantiles_ms(self.samples)
+
+
+def quantiles_ms(samples) -> Tuple[float, float] | None:
+    """(p50, p99) in ms of latency samples in seconds; None if there are none."""
+    if not samples:
+        return None
+    v = sorted(samples)
+    return percentile(v, 50) * 1000.0, percentile(v, 99) * 1000.0
+
+
+def format_lag(q: Tuple[float, float] | None, label: str = "lag") -> str:
+    if q is None:
+        return ""
+    p50, p99 = q
+    return f"{label} {p50:.0f}/{p99:.0f} ms"
+
+
+# ISO 8601 / RFC 3339 near the start of a line; naive times are local
+_LOG_TS = re.compile(r"(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2}:\d{2}(?:[.,]\d+)?)(Z|[+-]\d{2}:?\d{2})?")
+
+
+def log_timestamp(line: str) -> float | None:
+    """Epoch seconds of a timestamp in the first 64 characters, if any."""
+    m = _LOG_TS.search(line, 0, 64)
+    if m is None:
+        return None
+    date, clock, tz = m.groups()
+    if tz == "Z":
+        tz = "+00:00"
+    try:
+        return datetime.fromisoformat(f"{date}T{clock.replace(',', '.')}{tz or ''}").timestamp()
+    except ValueError:
+        return None
 
 # ----------------------------
 # FPS controller (WASD + mouse look)
 # ----------------------------
 class FPSController:
-    def __init__(self, base: ShowBase, speed: float = 6.0, boost: float = 14.0, sensitivity: float = 0.12):
+    def __init__(self, base: ShowBase, speed: float = 6.0, boost: float = 14.0, sensitivity: float = 0.12,
+                 profiler: Profiler | None = None):
         self.base = base
         base.disableMouse()
         self.cam = base.camera
 
         self.keymap = {"w": False, "a": False, "s": False, "d": False,
                        "space": False, "c": False, "shift": False}
-        for key in list(self.keymap.keys()):
-            base.accept(key, self._set_key, [key, True])
-            base.accept(f"{key}-up", self._set_key, [key, False])
-
-        base.accept("escape", self.toggle_mouse)
-        base.accept("q", self.quit)
+        self.bind_keys()
 
         # mouse capture
         self.mouse_captured = True
@@ -244,12 +3591,33 @@ class FPSController:
 
         self._win_center = None
 
-        base.taskMgr.add(self.update, "fps-update", sort=5)
+        update = self.update if profiler is None else profiler.wrap("fps-update", self.update)
+        base.taskMgr.add(update, "fps-update", sort=5)
+
+    def bind_keys(self):
+        base = self.base
+        for key in list(self.keymap.keys()):
+            base.accept(key, self._set_key, [key, True])
+            base.accept(f"{key}-up", self._set_key, [key, False])
+
+        base.accept("escape", self.toggle_mouse)
+        base.accept("q", self.quit)
+
+    def unbind_keys(self):
+        """Release movement/quit keys, e.g. while a text entry has the keyboard."""
+        for key in list(self.keymap.keys()):
+            self.base.ignore(key)
+            self.base.ignore(f"{key}-up")
+            self.keymap[key] = False
+        self.base.ignore("escape")
+        self.base.ignore("q")
 
     def _set_key(self, key, value):
         self.keymap[key] = value
 
     def _apply_mouse_props(self, capture: bool):
+        if not isinstance(self.base.win, GraphicsWindow):
+            return  # offscreen buffer (window-type offscreen): no cursor
         wp = WindowProperties()
         if capture:
             wp.setCursorHidden(True)
@@ -271,7 +3639,8 @@ class FPSController:
     def update(self, task: Task):
         dt = globalClock.getDt()
         # mouse look
-        if self.mouse_captured and self.base.mouseWatcherNode.hasMouse():
+        mw = self.base.mouseWatcherNode
+        if self.mouse_captured and mw is not None and mw.hasMouse():
             md = self.base.win.getPointer(0)
             if self._win_center is None:
                 sz = self.base.win.getXSize(), self.base.win.getYSize()
@@ -307,14 +3676,54 @@ class FPSController:
 # Main App
 # ----------------------------
 class App(ShowBase):
-    def __init__(self, file_list: List[str], font_path: str | None = None):
+    def __init__(self, file_list: List[str], font_path: str | None = None,
+                 scrollback_bytes: int = SCROLLBACK_BYTES,
+                 frame_budget_ms: float = FRAME_BUDGET_MS, ingest_cap: int = INGEST_CAP,
+                 overflow: str = "drop-oldest", renderer: str = "text", verbose: bool = False,
+                 engine: str = "threads", sources: List[LineSource] | None = None,
+                 backfill: int = 0, filters: FilterSet | None = None, heat: bool = False,
+                 profile_trace: str | None = None, log_timestamps: bool = False,
+                 workers: int = 1, watch: List[Tuple[str, str]] | None = None,
+                 session: str | None = None, session_every: float = SESSION_EVERY,
+                 subscribe: str | None = None, parser: FieldParser | None = None):
+        self._t_start = time.perf_counter()
+        if watch and engine != "threads":
+            raise ValueError("directory watching needs the threads engine")
+        # destroy() also runs (ShowBase's atexit) when this fails part-way
+        self._init_done = False
+        self.profile_trace = profile_trace
+        self.threads: List[threading.Thread] = []
+        # --engine processes forks its workers before Panda opens a window
+        self.q: IngestBuffer | None = None
+        if engine == "processes":
+            self.q = ProcessIngestEngine(file_list[:MAX_FILES], workers, filters,
+                                         cap=ingest_cap, policy=overflow)
         super().__init__()
 
         global globalClock
         globalClock = ClockObject.getGlobalClock()
 
+        # --watch-dir/--glob: files come and go; a retired file leaves an
+        # empty slot ("") in file_list that the next new file takes
+        self.watcher: DirWatcher | None = None
+        self._gone: Dict[str, float] = {}
+        if watch:
+            self.watcher = DirWatcher(watch)
+            found = [p for p in self.watcher.initial if p not in file_list]
+            # app.log.1 next to app.log is its history (PageUp), not a panel
+            names = set(file_list) | set(found)
+            file_list = file_list + [p for p in found if rotated_copy_of(p, names) is None]
         self.file_list = file_list[:MAX_FILES]
         self.font_path = font_path
+        self.font = load_font(font_path)  # resolved once, shared by all panels
+        self.verbose = verbose
+        panel_cls = LogPanel
+        if renderer == "atlas":
+            try:
+                GlyphAtlas.get(font_path if font_path and os.path.exists(font_path) else DEFAULT_FONT)
+                panel_cls = AtlasLogPanel
+            except ValueError as e:
+                print(f"[WARN] atlas renderer unavailable ({e}); using text")
 
         # Basic scene
         self.setBackgroundColor(0.03, 0.03, 0.05, 1)
@@ -322,22 +3731,68 @@ class App(ShowBase):
         self.camera.setPos(0, -START_CAMERA_DIST, 1.5)
         self.camera.lookAt(0, 0, 1.5)
 
+        # per-frame section timings (F5 HUD, F6 / --profile-trace trace dump)
+        self.profiler = Profiler(trace=profile_trace is not None)
+        LogPanel.profiler = self.profiler
+        timed = self.profiler.wrap
+
         # controller
-        self.controller = FPSController(self)
+        self.controller = FPSController(self, profiler=self.profiler)
 
         # queue and threads
-        self.q: "queue.Queue[Tuple[str,str]]" = queue.Queue()
-        self.threads: List[TailThread] = []
+        if self.q is not None:
+            pass  # ProcessIngestEngine, created above
+        elif subscribe:
+            # a tail daemon reads the files; --backfill comes from its backlog
+            self.q = SubscribeEngine(subscribe, self.file_list or None, backlog=backfill,
+                                     cap=ingest_cap, policy=overflow)
+            backfill = 0
+            self.taskMgr.doMethodLater(0.1, self._subscribe_task, "subscribe")
+        elif engine == "asyncio" or sources:
+            # file_list holds every source key (one panel each)
+            sources = sources or [FileSource(p) for p in self.file_list]
+            self.q = AsyncIngestEngine(sources[:MAX_FILES], cap=ingest_cap, policy=overflow)
+        else:
+            self.q = IngestBuffer(cap=ingest_cap, policy=overflow)
+        self.q.filters = filters
+        self.filters = filters
+        self.q.parser = parser
+        self.parser = parser
+        self.fields_view = False  # F7: panels show field aggregates instead of lines
+        if filters is not None:
+            self._register_highlights(filters)
+        self.frame_budget = frame_budget_ms / 1000.0
 
         # compute grid positions
         self.panels: Dict[str, LogPanel] = {}
         self.positions: List[Point3] = self._grid_positions(len(self.file_list), spacing=PANEL_SPACING)
 
-        for path, pos in zip(self.file_list, self.positions):
-            panel = LogPanel(self.render, os.path.basename(path), pos,
-                             width=PANEL_WIDTH, height=PANEL_HEIGHT,
-                             max_lines=PANEL_MAX_LINES, font_path=self.font_path)
-            self.panels[path] = panel
+        # every file has a cheap record; only panels near the camera get scene
+        # nodes, built a few per frame (see _virtualize_task) so the window
+        # shows up immediately and cost follows the visible window
+        self.panel_cls = panel_cls
+        self.scrollback_bytes = scrollback_bytes
+        self.records: Dict[str, PanelRecord] = {
+            path: PanelRecord(path, i, scrollback_bytes) for i, path in enumerate(self.file_list)}
+        self._t_first_frame: float | None = None
+        self._t_panels_ready: float | None = None
+        self.taskMgr.add(timed("virtualize", self._virtualize_task), "virtualize", sort=15)
+        self.taskMgr.add(self._startup_timing_task, "startup-timing", sort=60)
+
+        # scrollback of the focused panel (HistoryScrollback), None when live
+        self.scrollback: HistoryScrollback | None = None
+        self.scrollback_path: str | None = None
+
+        # full-text search over what the rings hold; fed as lines are drained
+        self.search = SearchIndex()
+        self.search_hits: List[Tuple[str, int, str]] = []
+        self.search_pos = 0
+        self._search_query = ""
+        self.search_entry: DirectEntry | None = None
+        self.search_text = OnscreenText(text="", pos=(-1.3, -0.85), scale=0.045,
+                                        fg=(0.9, 0.9, 0.6, 1), align=TextNode.ALeft,
+                                        mayChange=True)
+        self._prune_cursor = 0
 
         # focus state
         self.focus_index = 0 if self.file_list else -1
@@ -355,15 +3810,80 @@ class App(ShowBase):
         self.accept("-", self.zoom_out)  # key minus
         self.accept("home", self.focus_first)
         self.accept("end", self.focus_last)
+        self.accept("f3", self.toggle_stats)
+        self.accept("page_up", self.scroll_up)
+        self.accept("page_down", self.scroll_down)
+        self.accept("/", self.open_search)
+        self.accept("n", self.search_next)
+        self.accept("h", self.focus_busiest)
+        self.accept("f4", self.toggle_heat)
+        self.accept("f5", self.toggle_profile)
+        self.accept("f6", self.toggle_trace)
+        self.accept("f7", self.toggle_fields)
+
+        # on-screen ingest/render stats
+        self.stats = {"lines": 0, "refreshes": 0, "drain_ms": 0.0, "drain_ms_max": 0.0,
+                      "visible": 0}
+        self._stats_last = time.perf_counter()
+        self._stats_lines_last = 0
+        self._stats_in_last = 0
+        self.heat = heat  # tint cards by ingest rate
+        self.log_timestamps = log_timestamps  # also time from embedded log timestamps
+        self.stats_text = OnscreenText(text="", pos=(-1.3, 0.92), scale=0.045,
+                                       fg=(0.7, 0.9, 0.7, 1), align=TextNode.ALeft,
+                                       mayChange=True)
+        self.taskMgr.doMethodLater(0.5, timed("stats-update", self._stats_task), "stats-update")
+        self.profile_text = OnscreenText(text="", pos=(0.05, 0.92), scale=0.04,
+                                         fg=(0.8, 0.8, 1.0, 1), align=TextNode.ALeft,
+                                         mayChange=True, font=self.font)
+        self.profile_text.hide()
+        self.taskMgr.add(self._profile_task, "profile-frame", sort=99)
 
         # camera smoothing task
-        self.taskMgr.add(self._camera_smooth_task, "camera-smooth", sort=1)
+        self.taskMgr.add(timed("camera-smooth", self._camera_smooth_task), "camera-smooth", sort=1)
 
         # draining queue task
-        self.taskMgr.add(self._drain_queue, "drain-queue", sort=20)
+        self.taskMgr.add(timed("drain-queue", self._drain_queue), "drain-queue", sort=20)
+
+        # --session: rings, focus and zoom come back from the last snapshot;
+        # restored lines reach the search index lazily (see _index_lines)
+        self.session = session
+        self._session_writer: threading.Thread | None = None
+        self._unindexed: Dict[str, None] = {}
+        resume = self._restore_session() if session else {}
+        if session:
+            self.taskMgr.doMethodLater(session_every, timed("session-save", self._session_task), "session-save")
+            self.taskMgr.add(self._session_index_task, "session-index", sort=40)
+
+        # --backfill: last N lines of every file, read in parallel; tailing
+        # starts after them, from the exact offset each backfill ended at.
+        # Files restored by --session instead read what they missed since.
+        # Rotated copies top up short files afterwards, without holding up
+        # the tail (self._history).
+        self.backfill_lines = backfill  # also for files --watch-dir finds later
+        self.start_offsets: Dict[str, FilePos] = {}
+        self._backfill: Dict[str, Future] = {}
+        self._history: Dict[str, Future] = {}
+        if backfill > 0 or any(resume.values()):
+            self._backfill_pool = ThreadPoolExecutor(
+                max_workers=min(BACKFILL_WORKERS, max(1, len(self.file_list))),
+                thread_name_prefix="Backfill")
+            for path in self.file_list:
+                if path in resume:
+                    if resume[path] is not None:
+                        self._backfill[path] = self._backfill_pool.submit(self._resume_one, path, resume[path])
+                elif backfill > 0 and path and os.path.isfile(path):
+                    self._backfill[path] = self._backfill_pool.submit(self._backfill_one, path, backfill)
+            self.taskMgr.add(timed("backfill", self._backfill_task), "backfill", sort=18)
 
         # start threads AFTER initialization to avoid races (doMethodLater small delay)
+        self.tailer: InotifyTailer | None = None
         self.taskMgr.doMethodLater(0.2, self._start_threads_task, "start-threads")
+        if self.watcher is not None:
+            self.watcher.start()
+            self.threads.append(self.watcher)
+            self.taskMgr.doMethodLater(0.1, self._watch_task, "watch-dir")
+        self._init_done = True
 
     # # First version
     # def _grid_positions(self, n: int, spacing: float = PANEL_SPACING) -> List[Point3]:
@@ -391,24 +3911,279 @@ class App(ShowBase):
     def _grid_positions(self, n: int, spacing: float = PANEL_SPACING) -> List[Point3]:
         if n <= 0:
             return []
-        # center horizontally at y=5
-        total_w = (n - 1) * spacing
+        # center horizontally at y=5; rows of ROW_LEN going down
+        total_w = (min(n, ROW_LEN) - 1) * spacing
         start_x = -total_w / 2
         positions = []
         for i in range(n):
-            x = start_x + i * spacing
+            x = start_x + (i % ROW_LEN) * spacing
             y = 5.0
-            z = 1.8
+            z = 1.8 - (i // ROW_LEN) * ROW_SPACING
             positions.append(Point3(x, y, z))
         return positions
 
+    def _slot_near(self, pos: Point3) -> Tuple[int, int]:
+        """(row, col) of the grid slot closest to pos in x/z."""
+        n = len(self.file_list)
+        rows = (n + ROW_LEN - 1) // ROW_LEN
+        start_x = self.positions[0].x
+        col = int(round((pos.x - start_x) / PANEL_SPACING))
+        row = int(round((1.8 - pos.z) / ROW_SPACING))
+        return max(0, min(rows - 1, row)), max(0, min(ROW_LEN - 1, col))
+
+
+    # -----------------------
+    # startup
+    # -----------------------
+    def _virtualize_task(self, task: Task):
+        """Keep live panels for the slots around the camera, release the rest."""
+        if not self.file_list:
+            return Task.cont
+        row, col = self._slot_near(self.camera.getPos(self.render))
+        n = len(self.file_list)
+
+        def in_window(i: int, radius: int) -> bool:
+            return abs(i // ROW_LEN - row) <= 1 and abs(i % ROW_LEN - col) <= radius
+
+        for path in [p for p, panel in self.panels.items()
+                     if not in_window(self.records[p].index, VIRTUAL_RADIUS + VIRTUAL_HYSTERESIS)]:
+            self.panels.pop(path).release()
+        wanted = [r * ROW_LEN + c
+                  for r in (row, row - 1, row + 1)
+                  for c in sorted(range(col - VIRTUAL_RADIUS, col + VIRTUAL_RADIUS + 1),
+                                  key=lambda c: abs(c - col))
+                  if 0 <= c < ROW_LEN and 0 <= r * ROW_LEN + c < n]
+        built = 0
+        for i in wanted:
+            path = self.file_list[i]
+            if not path or path in self.panels:
+                continue
+            if built >= PANELS_PER_FRAME:
+                return Task.cont
+            rec = self.records[path]
+            self.panels[path] = self.panel_cls(
+                self.render, rec.title, self.positions[i],
+                width=PANEL_WIDTH, height=PANEL_HEIGHT,
+                max_lines=PANEL_MAX_LINES, font_path=self.font_path, font=self.font, record=rec)
+            built += 1
+        if self._t_panels_ready is None:
+            self._t_panels_ready = time.perf_counter()
+        return Task.cont
+
+    def _startup_timing_task(self, task: Task):
+        # sort=60 runs after igLoop (50), i.e. once a frame has been rendered
+        now = time.perf_counter()
+        if self._t_first_frame is None:
+            self._t_first_frame = now
+        if self._t_panels_ready is None:
+            return Task.cont
+        if self.verbose:
+            print(f"[STARTUP] first frame {(self._t_first_frame - self._t_start) * 1000:.1f} ms, "
+                  f"{len(self.panels)} panels around the camera ready {(self._t_panels_ready - self._t_start) * 1000:.1f} ms")
+        return Task.done
+
+    # -----------------------
+    # directory watch (--watch-dir / --glob)
+    # -----------------------
+    def _watch_task(self, task: Task):
+        events = self.watcher.events
+        while events:
+            op, path = events.popleft()
+            if op == "add":
+                self._gone.pop(path, None)
+                self.add_file(path)
+            elif op == "gone" and path in self.records:
+                self._gone.setdefault(path, time.monotonic())
+            elif op == "resync":
+                for p in self.records:
+                    if not os.path.exists(p):
+                        self._gone.setdefault(p, time.monotonic())
+        # vanished for longer than a rotation takes: retire the panel
+        now = time.monotonic()
+        for path in [p for p, t in self._gone.items() if now - t >= RETIRE_GRACE]:
+            del self._gone[path]
+            if not os.path.exists(path):
+                self.retire_file(path)
+        return Task.again
+
+    def _subscribe_task(self, task: Task):
+        # files the tail daemon serves get panels as it announces them
+        announced = self.q.announced
+        while announced:
+            self.add_file(announced.popleft())
+        return Task.again
+
+    def _tailed_as(self, path: str) -> str | None:
+        """The tailed file that path is a rotated copy or another name of, if any."""
+        base = rotated_copy_of(path, self.records)
+        if base is not None:
+            return base
+        try:
+            ino = os.stat(path).st_ino
+        except OSError:
+            return None
+        # the tailer's last position names the inode it still reads, even
+        # after a rename moved it away from the tailed path
+        for known in (self.q.positions, self.start_offsets):
+            for p, pos in list(known.items()):
+                if pos is not None and pos[0] == ino and p != path:
+                    return p
+        return None
+
+    def add_file(self, path: str):
+        """Give a newly appeared file a slot (the first empty one) and tail it."""
+        if path in self.records:
+            return
+        if self._tailed_as(path) is not None:
+            return  # a rotation renamed a tailed file; PageUp shows it as history
+        try:
+            i = self.file_list.index("")
+        except ValueError:
+            i = len(self.file_list)
+            if i >= MAX_FILES:
+                print(f"[WARN] {MAX_FILES} files already shown; not adding {path}")
+                return
+            x0 = self.positions[0].x if self.positions else 0.0
+            self.file_list.append("")
+            self.positions.append(Point3(x0 + (i % ROW_LEN) * PANEL_SPACING, 5.0,
+                                         1.8 - (i // ROW_LEN) * ROW_SPACING))
+        self.file_list[i] = path
+        rec = self.records[path] = PanelRecord(path, i, self.scrollback_bytes)
+        if self.focus_index < 0:
+            self._set_focus_target(i)
+        # like a startup file: its last --backfill lines, then tail from there
+        # (not from offset 0: a big log may have just been moved in)
+        lines, pos = tail_lines(path, self.backfill_lines)
+        if self.filters is not None:
+            lines = self.filters.apply(path, lines)
+        if lines:
+            self._index_lines(path, lines)
+            rec.extend_lines(lines)
+        if self.tailer is not None:
+            self.tailer.add(path, pos)
+        elif pos is not None:
+            self.start_offsets[path] = pos
+        print(f"[TAIL] added: {path}")
+
+    def retire_file(self, path: str):
+        """Drop a file that is gone: its panel, history, index and slot."""
+        rec = self.records.pop(path, None)
+        if rec is None:
+            return
+        if self.scrollback_path == path:
+            self.exit_scrollback()
+        panel = self.panels.pop(path, None)
+        if panel is not None:
+            panel.release()
+        self.file_list[rec.index] = ""
+        self.search.remove(path)
+        self.q.forget(path)
+        self.start_offsets.pop(path, None)
+        self._unindexed.pop(path, None)
+        if self.tailer is not None:
+            self.tailer.remove(path)  # forgets it again once no line can follow
+        print(f"[TAIL] retired: {path}")
 
     # -----------------------
     # tail threads
     # -----------------------
+    def _backfill_one(self, path: str, n: int) -> Tuple[List[str], FilePos | None, int]:
+        # pool thread: read and filter, like the ingest threads do; the
+        # shortfall is left to _history_one
+        lines, pos = tail_lines(path, n)
+        short = n - len(lines)
+        if self.filters is not None:
+            lines = self.filters.apply(path, lines)
+        return lines, pos, short
+
+    def _history_one(self, path: str, n: int) -> List[str]:
+        # pool thread: the last n lines of the rotated copies
+        lines = history_tail(path, n)
+        if self.filters is not None:
+            lines = self.filters.apply(path, lines)
+        return lines
+
+    def _resume_one(self, path: str, start: FilePos) -> Tuple[List[str], FilePos | None, int]:
+        # pool thread: the lines written since the snapshot, in one read
+        lines, pos = read_since(path, start, self.scrollback_bytes)
+        if self.filters is not None:
+            lines = self.filters.apply(path, lines)
+        return lines, pos, 0
+
+    def _backfill_task(self, task: Task):
+        """Hand finished backfills to their panels (or records) as they complete."""
+        for path in [p for p, fut in self._backfill.items() if fut.done()]:
+            fut = self._backfill.pop(path)
+            try:
+                lines, pos, short = fut.result()
+            except Exception as e:
+                lines, pos, short = [f"[ERROR backfilling {path}: {e}]"], None, 0
+            if pos is not None:
+                self.start_offsets[path] = pos
+            if short > 0:
+                self._history[path] = self._backfill_pool.submit(self._history_one, path, short)
+            target = self.panels.get(path) or self.records.get(path)
+            if target is not None and lines:
+                self._index_lines(path, lines)
+                target.extend_lines(lines)
+                if isinstance(target, LogPanel):
+                    target.refresh()
+        for path in [p for p, fut in self._history.items() if fut.done()]:
+            fut = self._history.pop(path)
+            try:
+                lines = fut.result()
+            except Exception as e:
+                lines = [f"[ERROR reading history of {path}: {e}]"]
+            rec = self.records.get(path)
+            if rec is not None and lines:
+                # older than everything shown: rebuild the ring and its index
+                rec.lines.prepend(lines)
+                self.search.remove(path)
+                self._index_ring(path)
+                panel = self.panels.get(path)
+                if panel is not None:
+                    panel.reload()
+        if self._backfill or self._history:
+            return Task.cont
+        self._backfill_pool.shutdown(wait=False)
+        return Task.done
+
     def _start_threads_task(self, task: Task):
-        for p in self.file_list:
-            t = TailThread(p, self.q)
+        if self._backfill:
+            return Task.again  # tail from where the backfill stopped
+        if isinstance(self.q, AsyncIngestEngine):
+            for src in self.q.sources:
+                if isinstance(src, FileSource):
+                    src.start = self.start_offsets.get(src.path)
+            self.q.start()
+            self.threads.append(self.q)
+            for src in self.q.sources:
+                print(f"[TAIL] started (asyncio): {src.key}")
+            return Task.done
+        if isinstance(self.q, SubscribeEngine):
+            self.q.start()
+            self.threads.append(self.q)
+            print(f"[TAIL] subscribed to {self.q.sock_path}")
+            return Task.done
+        if isinstance(self.q, ProcessIngestEngine):
+            self.q.start(self.start_offsets)
+            self.threads.append(self.q)
+            for i, shard in enumerate(self.q.shards):
+                for p in shard:
+                    print(f"[TAIL] started (worker {i}): {p}")
+            return Task.done
+        files = [p for p in self.file_list if p]
+        if inotify_available():
+            # one thread for all files, woken only by writes/rotations
+            t = self.tailer = InotifyTailer(files, self.q, starts=self.start_offsets)
+            t.start()
+            self.threads.append(t)
+            for p in files:
+                print(f"[TAIL] started (inotify): {p}")
+            return Task.done
+        # fallback: polling thread per file
+        for p in files:
+            t = TailThread(p, self.q, start=self.start_offsets.get(p))
             t.start()
             self.threads.append(t)
             print(f"[TAIL] started: {p}")
@@ -418,22 +4193,319 @@ class App(ShowBase):
     # queue drain
     # -----------------------
     def _drain_queue(self, task: Task):
-        processed = 0
-        while processed < 1000:
-            try:
-                path, line = self.q.get_nowait()
-            except queue.Empty:
+        # whole per-file batches, oldest-pending first, until the frame budget
+        # is spent; whatever is left waits in the ingest buffer for next frame
+        t0 = time.perf_counter()
+        deadline = t0 + self.frame_budget
+        self._update_visibility()
+        for path in self.q.ready_paths():
+            self._deliver(path, *self.q.take(path))
+            if time.perf_counter() >= deadline:
                 break
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.stats["drain_ms"] = ms
+        self.stats["drain_ms_max"] = max(self.stats["drain_ms_max"], ms)
+        return Task.cont
+
+    def _deliver(self, path: str, lines: List[str], skipped: int, stamp: float):
+        """Hand one taken batch to the file's panel, or to its record while virtualized."""
+        self._index_lines(path, lines)
+        panel = self.panels.get(path)
+        if panel is None:
+            rec = self.records.get(path)
+            if rec is not None:
+                rec.extend_lines(lines, skipped)
+            return
+        panel.add_skipped(skipped)
+        panel.extend_lines(lines)
+        if lines:
+            panel.stamp_batch(stamp, log_timestamp(lines[0]) if self.log_timestamps else None)
+        self.stats["refreshes"] += panel.refresh()
+        self.stats["lines"] += len(lines)
+
+    def _update_visibility(self):
+        """Mark panels inside the view frustum (and CULL_DISTANCE) visible.
+
+        Off-screen panels keep collecting lines and rebuild their text only
+        when they come back into view.
+        """
+        frustum = self.camLens.makeBounds()
+        frustum.xform(self.cam.getMat(self.render))
+        cam_pos = self.cam.getPos(self.render)
+        max_d2 = CULL_DISTANCE * CULL_DISTANCE
+        visible = 0
+        for panel in self.panels.values():
+            d2 = (panel.node.getPos() - cam_pos).lengthSquared()
+            v = (d2 <= max_d2
+                 and frustum.contains(panel.bounds) != BoundingBox.IF_no_intersection)
+            if v:
+                panel.set_lod(lod_for_distance(d2 ** 0.5))
+            if v != panel.visible:
+                panel.set_visible(v)
+            visible += v
+        self.stats["visible"] = visible
+
+    def _register_highlights(self, filters: FilterSet):
+        colors = {name: color for name, _, color in DEFAULT_HIGHLIGHTS}
+        mgr = TextPropertiesManager.getGlobalPtr()
+        for name, _ in filters.highlights:
+            tp = TextProperties()
+            tp.setTextColor(*colors.get(name, HIGHLIGHT_COLOR))
+            mgr.setProperties(f"hl-{name}", tp)
+
+    def _index_lines(self, path: str, lines: List[str]):
+        if path in self._unindexed:
+            self._index_ring(path)  # restored lines first: postings stay in order
+        rec = self.records.get(path)
+        if rec is not None and lines:
+            t0 = time.perf_counter()
+            self.search.add(path, rec.lines.evicted + len(rec.lines), lines)
+            self.profiler.add("search-index", t0, time.perf_counter())
+
+    def _index_ring(self, path: str):
+        self._unindexed.pop(path, None)
+        rec = self.records.get(path)
+        if rec is not None and len(rec.lines):
+            t0 = time.perf_counter()
+            self.search.add(path, rec.lines.evicted, list(rec.lines))
+            self.profiler.add("search-index", t0, time.perf_counter())
+
+    # -----------------------
+    # session snapshot (--session)
+    # -----------------------
+    def _restore_session(self) -> Dict[str, FilePos | None]:
+        """Load rings, focus and zoom from --session; returns each restored
+        file's resume position (None: tail it from EOF)."""
+        t0 = time.perf_counter()
+        try:
+            state, rings = read_session(self.session)
+            # check every field before touching anything: a malformed
+            # snapshot is ignored as a whole
+            restore = []
+            for entry in state["files"]:
+                path, pos = entry["path"], entry["pos"]
+                if pos:
+                    ino, off = pos
+                    pos = (int(ino), int(off))
+                restore.append((path, int(entry["skipped"]), pos or None))
+            zoom = min(MAX_ZOOM, max(MIN_ZOOM, float(state["zoom"])))
+            focus = self.records.get(state["focus"])
+            age = time.time() - float(state["time"])
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[WARN] ignoring session {self.session}: {e}")
+            return {}
+        resume: Dict[str, FilePos | None] = {}
+        for path, skipped, pos in restore:
+            rec = self.records.get(path)
+            if rec is None:
+                continue
+            rec.lines.load(*rings[path])
+            rec.skipped = skipped
+            self._unindexed[path] = None
+            resume[path] = pos
+        self.zoom = zoom
+        if focus is not None:
+            self._set_focus_target(focus.index)
+            # start there rather than fly in from the origin
+            self.camera.setPos(self.focus_target_pos)
+            self.camera.lookAt(self.focus_target_lookat)
+        print(f"[INFO] session: restored {len(resume)} files from {self.session} "
+              f"({format_age(age)} old) in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        return resume
+
+    def save_session(self, wait: bool = False):
+        """Snapshot every ring, where its file's tail resumes, focus and zoom.
+
+        Pending batches are delivered first, cut at the positions the
+        ingest buffer pairs them with, so a resume neither loses nor repeats
+        lines. The file is written in the background unless wait.
+        """
+        if self._backfill or not self.threads:
+            return  # offsets not settled yet; the previous snapshot still holds
+        if self._session_writer is not None and self._session_writer.is_alive():
+            if not wait:
+                return
+            self._session_writer.join()
+        batches, positions = self.q.cut()
+        for batch in batches:
+            self._deliver(*batch)
+        files, rings = [], []
+        for path in self.file_list:
+            rec = self.records.get(path)
+            if rec is None:
+                continue
+            pos = positions.get(path)
+            if pos is None and self.tailer is not None:
+                pos = self.start_offsets.get(path)  # not opened by the tailer yet
             panel = self.panels.get(path)
-            if panel:
-                panel.append_line(line)
-            processed += 1
+            sizes, payload = rec.lines.dump()
+            files.append({"path": path, "pos": pos, "lines": len(sizes), "bytes": len(payload),
+                          "skipped": panel.skipped if panel is not None else rec.skipped})
+            rings.append((sizes, payload))
+        focus = self.file_list[self.focus_index] if self.focus_index >= 0 else None
+        state = {"time": time.time(), "focus": focus, "zoom": self.zoom, "files": files}
+        t = self._session_writer = threading.Thread(
+            target=self._write_session, args=(state, rings), name="Session-write", daemon=True)
+        t.start()
+        if wait:
+            t.join()
+
+    def _write_session(self, state: dict, rings: List[Tuple[array.array, bytes]]):
+        try:
+            write_session(self.session, state, rings)
+        except OSError as e:
+            print(f"[WARN] could not write session {self.session}: {e}")
+
+    def _session_task(self, task: Task):
+        self.save_session()
+        return Task.again
+
+    def _session_index_task(self, task: Task):
+        # one restored ring per frame into the search index
+        if self._unindexed:
+            self._index_ring(next(iter(self._unindexed)))
+        return Task.cont if self._unindexed else Task.done
+
+    def _stats_task(self, task: Task):
+        now = time.perf_counter()
+        dt = max(1e-6, now - self._stats_last)
+        st = self.stats
+        in_rate = (self.q.total_in - self._stats_in_last) / dt
+        out_rate = (st["lines"] - self._stats_lines_last) / dt
+        meters = self.q.meters
+        mono = time.monotonic()
+        for m in list(meters.values()):
+            m.sample(mono)
+        hot = heapq.nlargest(3, meters.items(), key=lambda kv: kv[1].ewma_lps)
+        lag: List[float] = []
+        log_lag: List[float] = []
+        for panel in self.panels.values():
+            lag.extend(panel.latency.samples)
+            log_lag.extend(panel.log_latency.samples)
+            panel.set_lag(", ".join(filter(None, (format_lag(panel.latency.quantiles_ms()),
+                                                  format_lag(panel.log_latency.quantiles_ms(), "log")))))
+        lag_text = ", ".join(filter(None, (format_lag(quantiles_ms(lag), "read->draw p50/p99"),
+                                           format_lag(quantiles_ms(log_lag), "log->draw"))))
+        daemon_text = ""
+        if isinstance(self.q, SubscribeEngine):
+            daemon_text = (f"daemon {self.q.sock_path}: "
+                           + ("connected" if self.q.connected else "reconnecting"))
+        hot_text = "  ".join(f"{os.path.basename(p)} {m.ewma_lps:.0f} l/s"
+                             + (f" ({m.drops} dropped)" if m.drops else "")
+                             for p, m in hot if m.ewma_lps >= 0.5)
+        self.stats_text.setText(
+            f"in {in_rate:8.0f} l/s  shown {out_rate:8.0f} l/s  "
+            f"pending {self.q.depth()}  skipped {self.q.total_skipped}\n"
+            f"drain {st['drain_ms']:.2f} ms (max {st['drain_ms_max']:.2f}, "
+            f"budget {self.frame_budget * 1000:.1f})  refreshes {st['refreshes']}  "
+            f"policy {self.q.policy}  visible {st['visible']}/{len(self.panels)}"
+            + (f"\n{lag_text} (live panels)" if lag_text else "")
+            + (f"\nhot: {hot_text}" if hot_text else "")
+            + (f"\n{daemon_text}" if daemon_text else ""))
+        self._stats_last = now
+        self._stats_lines_last = st["lines"]
+        self._stats_in_last = self.q.total_in
+        st["drain_ms_max"] = 0.0
+        for path, panel in self.panels.items():
+            panel.decay_activity()
+            if self.filters is not None:
+                panel.set_counters(self.filters.summary(path))
+            m = meters.get(path)
+            if m is not None:
+                panel.set_rate(m.badge())
+                panel.set_heat(m.heat() if self.heat else 0.0)
+        if self.fields_view:
+            self._show_fields()
+        if self.scrollback is not None and self.scrollback.indexed_fraction < 1.0:
+            panel = self.panels.get(self.scrollback_path)
+            if panel is not None:
+                panel.set_status(self.scrollback.status())
+        # drop postings of evicted lines, a slice of the files per tick
+        paths = self.file_list
+        for k in range(min(SEARCH_PRUNE_PATHS, len(paths))):
+            rec = self.records.get(paths[(self._prune_cursor + k) % len(paths)])
+            if rec is not None:
+                self.search.prune(rec.path, rec.lines.evicted)
+        if paths:
+            self._prune_cursor = (self._prune_cursor + SEARCH_PRUNE_PATHS) % len(paths)
+        return Task.again
+
+    def _profile_task(self, task: Task):
+        # sort=99: after igLoop, so "frame" spans a whole rendered frame
+        self.profiler.end_frame()
+        if not self.profile_text.isHidden() and task.frame % 15 == 0:
+            self.profile_text.setText(self.profiler.summary())
         return Task.cont
 
+    def toggle_profile(self):
+        if self.profile_text.isHidden():
+            self.profile_text.setText(self.profiler.summary())
+            self.profile_text.show()
+        else:
+            self.profile_text.hide()
+
+    def toggle_trace(self):
+        """Start recording trace spans, or write what was recorded so far."""
+        prof = self.profiler
+        if prof.trace is None:
+            prof.trace = deque(maxlen=PROFILE_TRACE_EVENTS)
+            print("[INFO] profile trace recording (F6 again to write it)")
+            return
+        path = self.profile_trace or time.strftime("3dl128-trace-%Y%m%d-%H%M%S.json")
+        n = prof.dump_trace(path)
+        print(f"[INFO] wrote {n} trace events to {path}")
+        if self.profile_trace is None:
+            prof.trace = None
+
+    def toggle_fields(self):
+        """F7 (--parse): panels show level/status/latency aggregates, or lines again."""
+        if self.parser is None:
+            return
+        self.fields_view = not self.fields_view
+        if self.fields_view:
+            self._show_fields()  # then refreshed by the stats task
+            return
+        for path, panel in self.panels.items():
+            if path != self.scrollback_path:
+                panel.resume_live()
+
+    def _show_fields(self):
+        now = time.monotonic()
+        for path, panel in self.panels.items():
+            if path == self.scrollback_path or not panel.visible:
+                continue
+            cols = self.q.fields.get(path)
+            panel.show_page(field_summary(cols, now) if cols is not None else ["no lines yet"],
+                            f"fields, {self.parser.window:.0f}s")
+
+    def toggle_heat(self):
+        self.heat = not self.heat
+        if not self.heat:
+            for panel in self.panels.values():
+                panel.set_heat(0.0)
+
+    def focus_busiest(self):
+        """Jump to the file with the highest ingest rate (EWMA lines/s)."""
+        best = max(self.q.meters.items(), key=lambda kv: kv[1].ewma_lps, default=None)
+        if best is None or best[0] not in self.records:
+            return
+        self._set_focus_target(self.records[best[0]].index)
+
+    def toggle_stats(self):
+        if self.stats_text.isHidden():
+            self.stats_text.show()
+        else:
+            self.stats_text.hide()
+
     # -----------------------
     # focus & navigation
     # -----------------------
     def _set_focus_target(self, index: int):
+        if self.scrollback is not None and (index < 0 or index >= len(self.file_list)
+                                            or self.file_list[index] != self.scrollback_path):
+            self.exit_scrollback()
         if index < 0 or index >= len(self.file_list):
             self.focus_index = -1
             self.focus_target_pos = None
@@ -449,37 +4521,28 @@ class App(ShowBase):
 
     def focus_left(self):
         if self.focus_index < 0: return
-        cols = max(1, int(len(self.file_list)**0.5))
-        r = self.focus_index // cols
-        c = self.focus_index % cols
-        c = max(0, c - 1)
-        new = r*cols + c
-        if new < len(self.file_list):
-            self._set_focus_target(new)
+        # rows of ROW_LEN, as laid out by _grid_positions
+        if self.focus_index % ROW_LEN > 0:
+            self._set_focus_target(self.focus_index - 1)
 
     def focus_right(self):
         if self.focus_index < 0: return
-        cols = max(1, int(len(self.file_list)**0.5))
-        r = self.focus_index // cols
-        c = self.focus_index % cols
-        c = min(cols - 1, c + 1)
-        new = r*cols + c
-        if new < len(self.file_list):
+        new = self.focus_index + 1
+        if new % ROW_LEN and new < len(self.file_list):
             self._set_focus_target(new)
 
     def focus_up(self):
         if self.focus_index < 0: return
-        cols = max(1, int(len(self.file_list)**0.5))
-        new = max(0, self.focus_index - cols)
-        if new < len(self.file_list):
+        new = self.focus_index - ROW_LEN
+        if new >= 0:
             self._set_focus_target(new)
 
     def focus_down(self):
         if self.focus_index < 0: return
-        cols = max(1, int(len(self.file_list)**0.5))
-        new = min(len(self.file_list)-1, self.focus_index + cols)
-        if new < len(self.file_list):
-            self._set_focus_target(new)
+        row = self.focus_index // ROW_LEN + 1
+        if row * ROW_LEN < len(self.file_list):
+            # the last row may be shorter: its last panel then
+            self._set_focus_target(min(len(self.file_list) - 1, self.focus_index + ROW_LEN))
 
     def focus_first(self):
         if self.file_list:
@@ -500,6 +4563,110 @@ class App(ShowBase):
         if self.focus_index >= 0:
             self._set_focus_target(self.focus_index)
 
+    # -----------------------
+    # scrollback (focused panel)
+    # -----------------------
+    def scroll_up(self):
+        if self.focus_index < 0:
+            return
+        path = self.file_list[self.focus_index]
+        panel = self.panels.get(path)
+        if panel is None:
+            return
+        if self.scrollback is None:
+            try:
+                self.scrollback = HistoryScrollback(path, panel.page_lines)
+            except (OSError, ValueError) as e:
+                panel.set_status(f"no history: {e}")
+                return
+            self.scrollback_path = path
+        self.scrollback.page_up(panel.page_lines)
+        self._show_scrollback(panel)
+
+    def scroll_down(self):
+        if self.scrollback is None:
+            return
+        panel = self.panels.get(self.scrollback_path)
+        if panel is None or not self.scrollback.page_down(panel.page_lines):
+            self.exit_scrollback()
+            return
+        self._show_scrollback(panel)
+
+    def _show_scrollback(self, panel: LogPanel):
+        sb = self.scrollback
+        panel.show_page(sb.page(sb.top, panel.page_lines), sb.status())
+
+    def exit_scrollback(self):
+        if self.scrollback is None:
+            return
+        panel = self.panels.get(self.scrollback_path)
+        if panel is not None:
+            panel.resume_live()
+        self.scrollback.close()
+        self.scrollback = None
+        self.scrollback_path = None
+
+    # -----------------------
+    # search
+    # -----------------------
+    def open_search(self):
+        if self.search_entry is not None:
+            return
+        self.controller.unbind_keys()
+        for key in ("/", "n", "h", "+", "-"):
+            self.ignore(key)
+        self.accept("escape", self.close_search)
+        self.search_entry = DirectEntry(
+            text="", scale=0.05, pos=(-1.3, 0, -0.95), width=50, numLines=1,
+            focus=1, command=self._run_search, initialText="",
+            frameColor=(0.1, 0.1, 0.12, 0.9), text_fg=(1, 1, 1, 1))
+        self.search_text.setText("search: type words from a line, Enter to jump, Esc to cancel")
+
+    def close_search(self):
+        if self.search_entry is None:
+            return
+        self.search_entry.destroy()
+        self.search_entry = None
+        self.ignore("escape")
+        self.controller.bind_keys()
+        self.accept("/", self.open_search)
+        self.accept("n", self.search_next)
+        self.accept("h", self.focus_busiest)
+        self.accept("+", self.zoom_in)
+        self.accept("-", self.zoom_out)
+
+    def _run_search(self, query: str):
+        self.close_search()
+        rings = {path: rec.lines for path, rec in self.records.items()}
+        t0 = time.perf_counter()
+        hits = self.search.search(query, rings)
+        ms = (time.perf_counter() - t0) * 1000.0
+        # panel order, newest line first within a panel
+        order = {path: rec.index for path, rec in self.records.items()}
+        hits.sort(key=lambda h: (order[h[0]], -h[1]))
+        self.search_hits = hits
+        self.search_pos = 0
+        self._search_query = f"/{query}  ({len(hits)}{'+' if len(hits) >= SEARCH_LIMIT else ''} "\
+                             f"hits, {ms:.1f} ms)"
+        if not hits:
+            self.search_text.setText(self._search_query)
+            return
+        self._show_hit()
+
+    def search_next(self):
+        if not self.search_hits:
+            return
+        self.search_pos = (self.search_pos + 1) % len(self.search_hits)
+        self._show_hit()
+
+    def _show_hit(self):
+        path, seq, line = self.search_hits[self.search_pos]
+        rec = self.records[path]
+        self._set_focus_target(rec.index)
+        self.search_text.setText(
+            f"{self._search_query}  {self.search_pos + 1}/{len(self.search_hits)} [n: next]\n"
+            f"{rec.title}: {line[:160]}")
+
     # -----------------------
     # smooth camera move
     # -----------------------
@@ -533,6 +4700,16 @@ class App(ShowBase):
     # cleanup
     # -----------------------
     def destroy(self):
+        if self._init_done:
+            if self.profile_trace is not None:
+                n = self.profiler.dump_trace(self.profile_trace)
+                print(f"[INFO] wrote {n} trace events to {self.profile_trace}")
+            self.close_search()
+            self.exit_scrollback()
+            if self.session:
+                self.save_session(wait=True)
+        if self.q is not None:
+            self.q.close()
         for t in self.threads:
             try:
                 t.stop()
@@ -544,20 +4721,199 @@ class App(ShowBase):
 # Argument parsing and main
 # ----------------------------
 def parse_args() -> argparse.Namespace:
-    ap = argparse.ArgumentParser(description="3D log viewer — up to 128 files")
-    ap.add_argument("--file", "-f", action="append", required=True, help="Path to file to tail (repeatable)")
+    ap = argparse.ArgumentParser(description=f"3D log viewer — up to {MAX_FILES} files")
+    ap.add_argument("--file", "-f", action="append", default=[], help="Path to file to tail (repeatable)")
+    ap.add_argument("--watch-dir", action="append", default=[], metavar="DIR",
+                    help="Show every file in DIR, adding and retiring panels as files come and go "
+                         "(repeatable; inotify)")
+    ap.add_argument("--glob", action="append", default=[], metavar="PATTERN",
+                    help="Like --watch-dir for files matching PATTERN, e.g. '/var/log/containers/*.log' "
+                         "(wildcards in the file name only; repeatable)")
+    ap.add_argument("--cmd", action="append", default=[], metavar="NAME=COMMAND",
+                    help="Follow a command's output, e.g. 'journal=journalctl -f' (repeatable; asyncio engine)")
+    ap.add_argument("--socket", action="append", default=[], metavar="PATH",
+                    help="Listen on a Unix socket for lines (repeatable; asyncio engine)")
+    ap.add_argument("--fifo", action="append", default=[], metavar="PATH",
+                    help="Read lines from a named pipe (repeatable; asyncio engine)")
+    ap.add_argument("--engine", choices=ENGINES, default="threads",
+                    help="Ingest: tail threads, one asyncio loop for all sources, or worker "
+                         "processes for files (default %(default)s)")
+    ap.add_argument("--workers", type=int, default=max(1, min(8, (os.cpu_count() or 2) - 1)),
+                    help="Worker processes for --engine processes (default %(default)s)")
     ap.add_argument("--font", help="Optional path to TTF font to use")
-    return ap.parse_args()
+    ap.add_argument("--renderer", choices=RENDERERS, default="text",
+                    help="Panel body: TextNode ('text') or glyph-atlas texture ring ('atlas')")
+    ap.add_argument("--frame-budget-ms", type=float, default=FRAME_BUDGET_MS,
+                    help="Max time per frame spent applying new lines (default %(default)s)")
+    ap.add_argument("--ingest-cap", type=int, default=INGEST_CAP,
+                    help="Pending lines buffered per file (default %(default)s)")
+    ap.add_argument("--overflow", choices=OVERFLOW_POLICIES, default="drop-oldest",
+                    help="What to do when a file's buffer is full (default %(default)s)")
+    ap.add_argument("--scrollback-bytes", type=int, default=SCROLLBACK_BYTES,
+                    help="UTF-8 history kept per panel, in bytes (default %(default)s)")
+    ap.add_argument("--include", action="append", default=[], metavar="REGEX",
+                    help="Only show lines matching REGEX (repeatable; any may match)")
+    ap.add_argument("--exclude", action="append", default=[], metavar="REGEX",
+                    help="Hide lines matching REGEX (repeatable)")
+    ap.add_argument("--panel-include", action="append", nargs=2, default=[], metavar=("GLOB", "REGEX"),
+                    help="Also require REGEX for files whose path or name matches GLOB "
+                         "(on top of --include)")
+    ap.add_argument("--panel-exclude", action="append", nargs=2, default=[], metavar=("GLOB", "REGEX"),
+                    help="Like --exclude, only for files whose path or name matches GLOB")
+    ap.add_argument("--highlight", action="append", nargs=2, default=[], metavar=("NAME", "REGEX"),
+                    help="Color matches of REGEX and count them as NAME (in addition to ERROR/WARN)")
+    ap.add_argument("--no-highlight", action="store_true", help="No ERROR/WARN keyword highlighting")
+    ap.add_argument("--fixed-strings", "-F", action="store_true",
+                    help="Treat filter and highlight patterns as plain substrings")
+    ap.add_argument("--backfill", type=int, default=0, metavar="N",
+                    help="Start each panel with the file's last N lines (read backwards from EOF)")
+    ap.add_argument("--serve", metavar="SOCKET",
+                    help="Run headless: tail the --file paths once and publish their lines on "
+                         "Unix socket SOCKET for --subscribe viewers")
+    ap.add_argument("--serve-backlog", type=int, default=SERVE_BACKLOG, metavar="N",
+                    help="--serve: recent lines kept per file for (re)connecting viewers "
+                         "(default %(default)s)")
+    ap.add_argument("--subscribe", metavar="SOCKET",
+                    help="Get lines from a --serve daemon instead of tailing; shows the --file "
+                         "paths, or every file it serves if none are given")
+    ap.add_argument("--session", metavar="PATH",
+                    help="Snapshot panels, file offsets, focus and zoom to PATH (on exit and "
+                         "periodically) and resume from it at startup; offsets need --engine "
+                         "threads with inotify, other engines resume at EOF")
+    ap.add_argument("--session-every", type=float, default=SESSION_EVERY, metavar="SECONDS",
+                    help="Seconds between periodic --session snapshots (default %(default)s)")
+    ap.add_argument("--parse", choices=PARSE_FORMATS,
+                    help="Extract level/status/latency from JSON or logfmt lines; F7 shows "
+                         "per-panel aggregates (needs numpy)")
+    ap.add_argument("--field", action="append", default=[], metavar="ROLE=KEY[,KEY...]",
+                    help="Keys to read a field from, ROLE one of " + ", ".join(FIELD_NAMES)
+                         + " (repeatable; nested JSON keys as a.b)")
+    ap.add_argument("--field-window", type=float, default=FIELD_WINDOW, metavar="SECONDS",
+                    help="Sliding window of the F7 aggregates (default %(default)s)")
+    ap.add_argument("--heat", action="store_true",
+                    help="Tint panel cards by ingest rate (toggle with F4)")
+    ap.add_argument("--log-timestamps", action="store_true",
+                    help="Also measure display latency from ISO 8601 timestamps at the start of lines")
+    ap.add_argument("--profile-trace", metavar="PATH",
+                    help="Record per-frame task spans from startup and write them to PATH "
+                         "(Chrome trace JSON) on exit")
+    ap.add_argument("--verbose", "-v", action="store_true", help="Print startup timings")
+    args = ap.parse_args()
+    if args.serve_backlog < 0:
+        ap.error("--serve-backlog must be 0 or more")
+    return args
+
+def build_sources(args: argparse.Namespace) -> List[LineSource]:
+    sources: List[LineSource] = [FileSource(os.path.abspath(p)) for p in args.file]
+    for spec in args.cmd:
+        name, sep, command = spec.partition("=")
+        if not sep or not command.strip():
+            raise SystemExit(f"--cmd expects NAME=COMMAND, got {spec!r}")
+        sources.append(CommandSource(f"cmd:{name}", shlex.split(command)))
+    for p in args.socket:
+        if os.path.lexists(p) and not stat.S_ISSOCK(os.lstat(p).st_mode):
+            raise SystemExit(f"--socket {p}: exists and is not a socket")
+    sources += [UnixSocketSource(os.path.abspath(p)) for p in args.socket]
+    sources += [FifoSource(os.path.abspath(p)) for p in args.fifo]
+    return sources[:MAX_FILES]
+
+def raise_nofile_limit(wanted: int):
+    """Thousands of tailed files need more fds than the usual soft limit of 1024."""
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+        if soft != resource.RLIM_INFINITY and soft < target:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    except (ValueError, OSError):
+        pass
+
+def build_filters(args: argparse.Namespace) -> FilterSet | None:
+    highlights = [] if args.no_highlight else [(name, rx) for name, rx, _ in DEFAULT_HIGHLIGHTS]
+    highlights += [(name, rx) for name, rx in args.highlight]
+    per_panel = [(glob, "include", rx) for glob, rx in args.panel_include] + \
+                [(glob, "exclude", rx) for glob, rx in args.panel_exclude]
+    if not (args.include or args.exclude or per_panel or highlights):
+        return None
+    if args.fixed_strings:
+        # built-in severity keywords stay regexes
+        highlights = [(n, rx if n in {d[0] for d in DEFAULT_HIGHLIGHTS} else re.escape(rx))
+                      for n, rx in highlights]
+    try:
+        return FilterSet(args.include, args.exclude, per_panel, highlights,
+                         fixed_strings=args.fixed_strings)
+    except re.error as e:
+        raise SystemExit(f"bad filter pattern {e.pattern!r}: {e}")
+
+def build_parser(args: argparse.Namespace) -> FieldParser | None:
+    if not args.parse:
+        return None
+    if np is None:
+        raise SystemExit("--parse needs numpy (pip install numpy)")
+    names = {}
+    for spec in args.field:
+        role, _, keys = spec.partition("=")
+        if role not in FIELD_NAMES or not keys:
+            raise SystemExit(f"bad --field {spec!r}: expected ROLE=KEY with ROLE one of {', '.join(FIELD_NAMES)}")
+        names[role] = tuple(k for k in keys.split(",") if k)
+    return FieldParser(args.parse, names, window=args.field_window)
 
 def main():
     args = parse_args()
-    files = [os.path.abspath(p) for p in args.file][:MAX_FILES]
-    if not files:
+    filters = build_filters(args)
+    parser = build_parser(args)
+    sources = None
+    try:
+        watch = watch_specs(args.watch_dir, args.glob)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if watch and (args.engine != "threads" or args.cmd or args.socket or args.fifo):
+        raise SystemExit("--watch-dir/--glob work with --engine threads and --file only")
+    if watch and not inotify_available():
+        raise SystemExit("--watch-dir/--glob need inotify (Linux)")
+    if args.engine == "processes":
+        if args.cmd or args.socket or args.fifo:
+            raise SystemExit("--engine processes only tails files (--file)")
+        if args.overflow == "block":
+            raise SystemExit("--overflow block is not supported by the processes engine")
+        if parser is not None:
+            raise SystemExit("--parse is not supported by the processes engine")
+    if args.serve or args.subscribe:
+        if args.engine != "threads" or args.cmd or args.socket or args.fifo or watch:
+            raise SystemExit("--serve/--subscribe work with --file only")
+        if args.serve and args.subscribe:
+            raise SystemExit("--serve and --subscribe are exclusive")
+    if args.serve:
+        files = [os.path.abspath(p) for p in args.file][:MAX_FILES]
+        if not files:
+            raise SystemExit("No files specified.")
+        raise_nofile_limit(len(files) + 256)
+        try:
+            serve(files, args.serve, backlog=args.serve_backlog)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"--serve {args.serve}: {e}")
+        return
+    if args.engine == "asyncio" or args.cmd or args.socket or args.fifo:
+        args.engine = "asyncio"
+        if args.overflow == "block":
+            raise SystemExit("--overflow block is not supported by the asyncio engine")
+        sources = build_sources(args)
+        files = [src.key for src in sources]
+    else:
+        files = [os.path.abspath(p) for p in args.file][:MAX_FILES]
+    if not files and not watch and not args.subscribe:
         raise SystemExit("No files specified.")
+    raise_nofile_limit((MAX_FILES if watch else len(files)) + 256)
     print("[INFO] following files (count={}):".format(len(files)))
     for p in files:
         print("  ", p)
-    app = App(files, font_path=args.font)
+    app = App(files, font_path=args.font, scrollback_bytes=args.scrollback_bytes,
+              frame_budget_ms=args.frame_budget_ms,
+              ingest_cap=args.ingest_cap, overflow=args.overflow, renderer=args.renderer,
+              verbose=args.verbose, engine=args.engine, sources=sources,
+              backfill=args.backfill, filters=filters, heat=args.heat,
+              profile_trace=args.profile_trace, log_timestamps=args.log_timestamps,
+              workers=args.workers, watch=watch, session=args.session,
+              session_every=args.session_every, subscribe=args.subscribe, parser=parser)
     app.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+3dl128_bench.py
+
+Microbenchmarks for 3dl128.py.
+
+Usage:
+  python3 3dl128_bench.py split [--size-mb 100] [--burst-kb 1024]
+  python3 3dl128_bench.py render [--panels 4] [--frames 60]
+  python3 3dl128_bench.py harness [--files 16] [--rate 200] [--seconds 10] [--out report.json]
+
+Subcommands:
+  split   feed a generated file through the old string splitter and the
+          byte-oriented LineSplitter, report MB/s and lines/s for each
+  render  offscreen: highest lines/s each panel renderer sustains while the
+          mean frame time stays within 60 fps
+  harness offscreen: the full viewer tailing N temp files fed by synthetic
+          writer processes (rate, line length, bursts, rotation, truncation);
+          reports ingest rate, frame times, queue depth, memory and
+          write-to-screen latency as JSON
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+
+def load_viewer():
+    """Import 3dl128.py (not importable by name, it starts with a digit)."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "3dl128.py")
+    spec = importlib.util.spec_from_file_location("logs_128", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+# ----------------------------
+# split
+# ----------------------------
+def make_log(path: str, size_mb: int, seed: int = 1):
+    """Write ~size_mb of log-like lines, with occasional multi-KB lines."""
+    rnd = random.Random(seed)
+    words = ["GET", "POST", "/api/v1/items", "200", "404", "upstream", "timeout",
+             "request_id=7f3a9c", "user=42", "ms=13", "ERROR", "INFO", "WARN"]
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, "w") as f:
+        while written < target:
+            if rnd.random() < 0.01:
+                line = "Traceback: " + " ".join(rnd.choice(words) for _ in range(600))
+            else:
+                line = " ".join(rnd.choice(words) for _ in range(rnd.randint(4, 30)))
+            f.write(line + "\n")
+            written += len(line) + 1
+
+
+def old_split(path: str, burst: int) -> int:
+    """The pre-LineSplitter loop from follow_file(), fed burst chars at a time."""
+    count = 0
+    with open(path, "r", errors="replace") as f:
+        buff = ""
+        while True:
+            chunk = f.read(burst)
+            if not chunk:
+                break
+            buff += chunk
+            while True:
+                nl = buff.find("\n")
+                if nl == -1:
+                    break
+                line, buff = buff[:nl], buff[nl+1:]
+                count += 1
+    return count
+
+
+def new_split(mod, path: str, burst: int) -> int:
+    count = 0
+    splitter = mod.LineSplitter()
+    buf = bytearray(mod.READ_SIZE)
+    size = os.path.getsize(path)
+    with open(path, "rb", buffering=0) as f:
+        while f.tell() < size:
+            # emulate a writer burst of `burst` bytes between wake-ups
+            count += sum(map(len, mod.read_lines(_Limited(f, burst), splitter, buf)))
+    return count
+
+
+class _Limited:
+    """readinto() wrapper that stops after `limit` bytes (one simulated burst)."""
+
+    def __init__(self, f, limit: int):
+        self.f = f
+        self.left = limit
+
+    def readinto(self, buf) -> int:
+        if self.left <= 0:
+            return 0
+        with memoryview(buf) as mv:
+            n = self.f.readinto(mv[:min(len(buf), self.left)])
+        self.left -= n or 0
+        return n
+
+
+def timed(fn: Callable[[], int]) -> Tuple[float, int]:
+    t0 = time.perf_counter()
+    n = fn()
+    return time.perf_counter() - t0, n
+
+
+def cmd_split(args) -> int:
+    mod = load_viewer()
+    burst = args.burst_kb * 1024
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "bench.log")
+        print(f"[BENCH] generating {args.size_mb} MB ...")
+        make_log(path, args.size_mb)
+        size = os.path.getsize(path) / (1024 * 1024)
+        results: List[Tuple[str, float, int]] = []
+        for name, fn in (("old (str slicing)", lambda: old_split(path, burst)),
+                         ("new (LineSplitter)", lambda: new_split(mod, path, burst))):
+            dt, n = timed(fn)
+            results.append((name, dt, n))
+            print(f"  {name:20s} {dt:8.3f}s  {size / dt:8.1f} MB/s  {n / dt:12.0f} lines/s  ({n} lines)")
+        if results[0][2] != results[1][2]:
+            print("[BENCH] WARNING: line counts differ")
+            return 1
+        print(f"  speedup: {results[0][1] / results[1][1]:.1f}x")
+    return 0
+
+# ----------------------------
+# render
+# ----------------------------
+FRAME_60FPS = 1.0 / 60.0
+
+
+def offscreen_base():
+    from panda3d.core import loadPrcFileData
+    loadPrcFileData("", "window-type offscreen\naudio-library-name null\nsync-video false")
+    from direct.showbase.ShowBase import ShowBase
+    return ShowBase()
+
+
+def frame_time(base, panels, lines_per_frame: int, frames: int, line: str) -> float:
+    """Mean seconds per frame for appending lines_per_frame lines to each panel."""
+    batch = [line] * lines_per_frame
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        for p in panels:
+            p.extend_lines(batch)
+            p.refresh()
+        base.graphicsEngine.renderFrame()
+    return (time.perf_counter() - t0) / frames
+
+
+def cmd_render(args) -> int:
+    mod = load_viewer()
+    base = offscreen_base()
+    line = "2026-10-18T03:18:07Z INFO upstream request_id=7f3a9c status=200 ms=13 GET /api/v1/items"
+    for renderer, cls in (("text", mod.LogPanel), ("atlas", mod.AtlasLogPanel)):
+        root = base.render.attachNewNode(f"bench-{renderer}")
+        panels = []
+        for i in range(args.panels):
+            pos = mod.Point3((i - (args.panels - 1) / 2) * mod.PANEL_SPACING, 5.0 + mod.FOCUS_DIST * 4, 1.8)
+            panels.append(cls(root, f"{renderer}-{i}", pos, font_path=args.font))
+        base.camera.setPos(0, 0, 1.8)
+        base.camera.lookAt(0, 10, 1.8)
+        # start full, as in steady state: the text renderer's cost grows
+        # with panel fill, which would otherwise be measured as the ramp
+        for p in panels:
+            p.extend_lines([line] * mod.PANEL_MAX_LINES)
+            p.refresh()
+        frame_time(base, panels, 1, 10, line)  # warm up
+        best = 0
+        lpf = 1
+        while lpf <= args.max_lines_per_frame:
+            dt = frame_time(base, panels, lpf, args.frames, line)
+            ok = dt <= FRAME_60FPS
+            print(f"  {renderer:5s} {lpf:6d} lines/frame/panel  {dt * 1000:7.2f} ms/frame  {'ok' if ok else 'over'}")
+            if not ok:
+                break
+            best = lpf
+            lpf *= 2
+        rate = best * args.panels * 60
+        print(f"[BENCH] {renderer}: sustained {rate} lines/s at 60 fps across {args.panels} panels")
+        root.removeNode()
+    base.destroy()
+    return 0
+
+# ----------------------------
+# harness
+# ----------------------------
+WRITER_TICK = 0.005  # seconds between writer wake-ups
+
+
+def writer_main(paths: List[str], args, seed: int, stop, written, rotations, truncations):
+    """Append timestamped lines to paths at args.rate lines/s each, with bursts,
+    rotation (rename to .1, reopen) and truncation on the configured periods."""
+    rnd = random.Random(seed)
+    filler = " ".join(rnd.choice(["GET", "POST", "/api/v1/items", "200", "upstream", "timeout",
+                                  "user=42", "ms=13", "INFO", "cache", "miss"])
+                      for _ in range(args.max_len))
+    files = {p: open(p, "a") for p in paths}
+    seq = 0
+    owed = 0.0
+    t_start = last = time.monotonic()
+    next_rotate = t_start + args.rotate_every if args.rotate_every else float("inf")
+    next_truncate = t_start + args.truncate_every if args.truncate_every else float("inf")
+    while not stop.is_set():
+        now = time.monotonic()
+        rate = args.rate
+        if args.burst_every and (now - t_start) % args.burst_every < args.burst_len:
+            rate *= args.burst_factor
+        owed += rate * (now - last)
+        last = now
+        n = int(owed)
+        owed -= n
+        if n:
+            ts = time.monotonic_ns()
+            for f in files.values():
+                f.write("".join(f"ts={ts} seq={seq + i} {filler[:rnd.randint(args.min_len, args.max_len)]}\n"
+                                for i in range(n)))
+                f.flush()
+            seq += n
+            with written.get_lock():
+                written.value += n * len(files)
+        if now >= next_rotate:
+            for p, f in files.items():
+                f.close()
+                os.replace(p, p + ".1")
+                files[p] = open(p, "a")
+            rotations.value += 1
+            next_rotate += args.rotate_every
+        if now >= next_truncate:
+            for p in files:
+                os.truncate(p, 0)
+            truncations.value += 1
+            next_truncate += args.truncate_every
+        time.sleep(WRITER_TICK)
+    for f in files.values():
+        f.close()
+
+
+class LatencyProbe:
+    """After each rendered frame, how old the first and last newly displayed
+    line of every on-screen panel are (their ts= stamp vs. now)."""
+
+    def __init__(self, app):
+        self.app = app
+        self.seen: Dict[str, int] = {}
+        self.samples: List[float] = []
+
+    def task(self, task):
+        now = time.monotonic_ns()
+        for path, panel in self.app.panels.items():
+            if panel.dirty or not panel.visible:
+                continue  # new lines not drawn yet
+            ring = panel.lines
+            end = ring.evicted + len(ring)
+            last = self.seen.get(path, end)
+            self.seen[path] = end
+            if end == last:
+                continue
+            for seq in {max(last, ring.evicted), end - 1}:
+                line = ring.line(seq - ring.evicted)
+                if line.startswith("ts="):
+                    self.samples.append((now - int(line[3:line.index(" ")])) / 1e6)
+        return task.cont
+
+
+def distribution(values: List[float], pcts=(50, 90, 99)) -> Dict[str, float]:
+    from statistics import fmean
+    v = sorted(values)
+    if not v:
+        return {"samples": 0}
+    out = {"samples": len(v), "mean": round(fmean(v), 3)}
+    for p in pcts:
+        out[f"p{p}"] = round(v[min(len(v) - 1, int(len(v) * p / 100))], 3)
+    out["max"] = round(v[-1], 3)
+    return out
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def cmd_harness(args) -> int:
+    from panda3d.core import loadPrcFileData
+    loadPrcFileData("", "window-type offscreen\naudio-library-name null\nsync-video false")
+    mod = load_viewer()
+    ctx = multiprocessing.get_context("fork")
+    with tempfile.TemporaryDirectory() as d:
+        paths = [os.path.join(d, f"synthetic-{i:04d}.log") for i in range(args.files)]
+        for p in paths:
+            open(p, "w").close()
+        stop = ctx.Event()
+        written, rotations, truncations = ctx.Value("q", 0), ctx.Value("q", 0), ctx.Value("q", 0)
+        writers = [ctx.Process(target=writer_main, daemon=True,
+                               args=(paths[i::args.writers], args, i, stop, written, rotations, truncations))
+                   for i in range(min(args.writers, args.files))]
+        # writers are forked before Panda opens its buffer
+        for w in writers:
+            w.start()
+        with contextlib.redirect_stdout(sys.stderr):
+            app = mod.App(paths, font_path=args.font, renderer=args.renderer, engine=args.engine,
+                          overflow=args.overflow, ingest_cap=args.ingest_cap,
+                          frame_budget_ms=args.frame_budget_ms)
+            probe = LatencyProbe(app)
+            app.taskMgr.add(probe.task, "bench-latency", sort=70)
+            report = run_harness(app, probe, args, written)
+            app.destroy()
+        stop.set()
+        for w in writers:
+            w.join(timeout=2.0)
+        report["writers"] = {"rotations": rotations.value, "truncations": truncations.value}
+    report["config"] = {k: v for k, v in vars(args).items() if k != "func"}
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+def run_harness(app, probe: LatencyProbe, args, written) -> dict:
+    frame = 1.0 / args.fps if args.fps else 0.0
+    step = app.taskMgr.step
+    t_warm = time.perf_counter() + args.warmup
+    while time.perf_counter() < t_warm:
+        step()
+    probe.samples.clear()
+    base = (written.value, app.q.total_in, app.q.total_skipped, app.stats["lines"])
+    frames: List[float] = []
+    depths: List[int] = []
+    t_start = time.perf_counter()
+    t_end = t_start + args.seconds
+    while True:
+        t0 = time.perf_counter()
+        if t0 >= t_end:
+            break
+        step()
+        t1 = time.perf_counter()
+        frames.append((t1 - t0) * 1000.0)
+        depths.append(app.q.depth())
+        if frame and t1 - t0 < frame:
+            time.sleep(frame - (t1 - t0))
+    elapsed = time.perf_counter() - t_start
+    w, ingested, dropped, shown = (cur - b for cur, b in zip(
+        (written.value, app.q.total_in, app.q.total_skipped, app.stats["lines"]), base))
+    rings = [rec.lines for rec in app.records.values()]
+    return {
+        "seconds": round(elapsed, 3),
+        "lines": {"written": w, "ingested": ingested, "dropped": dropped, "drained_to_panels": shown,
+                  "written_per_s": round(w / elapsed), "ingested_per_s": round(ingested / elapsed)},
+        "frame_ms": distribution(frames),
+        "fps": round(len(frames) / elapsed, 1),
+        "queue_depth": distribution(depths),
+        "latency_ms": distribution(probe.samples),
+        "memory_mb": {"rss": round(rss_mb(), 1),
+                      "max_rss": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                      "ring_held": round(sum(r.nbytes for r in rings) / 2**20, 2),
+                      "ring_reserved": round(sum(r.cap for r in rings) / 2**20, 2)},
+        "panels": {"live": len(app.panels), "visible": app.stats["visible"]},
+    }
+
+# ----------------------------
+# Argument parsing and main
+# ----------------------------
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="3dl128 benchmarks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sp = sub.add_parser("split", help="old vs new line splitter")
+    sp.add_argument("--size-mb", type=int, default=100, help="Size of generated log (MB)")
+    sp.add_argument("--burst-kb", type=int, default=1024, help="Bytes available per wake-up (KB)")
+    sp.set_defaults(func=cmd_split)
+    rp = sub.add_parser("render", help="text vs atlas panel renderer at 60 fps")
+    rp.add_argument("--panels", type=int, default=4, help="Panels updated every frame")
+    rp.add_argument("--frames", type=int, default=60, help="Frames measured per step")
+    rp.add_argument("--max-lines-per-frame", type=int, default=4096, help="Upper bound of the ramp")
+    rp.add_argument("--font", help="Optional path to TTF font to use")
+    rp.set_defaults(func=cmd_render)
+    hp = sub.add_parser("harness", help="full viewer offscreen against synthetic writers, JSON report")
+    hp.add_argument("--files", type=int, default=16, help="Synthetic log files (default %(default)s)")
+    hp.add_argument("--writers", type=int, default=2, help="Writer processes, files sharded across them")
+    hp.add_argument("--rate", type=float, default=200.0, help="Lines/s per file (default %(default)s)")
+    hp.add_argument("--min-len", type=int, default=40, help="Shortest line payload (chars)")
+    hp.add_argument("--max-len", type=int, default=200, help="Longest line payload (chars)")
+    hp.add_argument("--burst-every", type=float, default=0.0, help="Seconds between bursts (0: none)")
+    hp.add_argument("--burst-len", type=float, default=0.5, help="Burst duration (s)")
+    hp.add_argument("--burst-factor", type=float, default=10.0, help="Rate multiplier during bursts")
+    hp.add_argument("--rotate-every", type=float, default=0.0, help="Rename+reopen period (s, 0: never)")
+    hp.add_argument("--truncate-every", type=float, default=0.0, help="Truncate period (s, 0: never)")
+    hp.add_argument("--seconds", type=float, default=10.0, help="Measured duration")
+    hp.add_argument("--warmup", type=float, default=2.0, help="Unmeasured start-up time (s)")
+    hp.add_argument("--fps", type=float, default=60.0, help="Frame pacing (0: as fast as possible)")
+    hp.add_argument("--renderer", default="text", help="Viewer --renderer")
+    hp.add_argument("--engine", default="threads", help="Viewer --engine")
+    hp.add_argument("--overflow", default="drop-oldest", help="Viewer --overflow")
+    hp.add_argument("--ingest-cap", type=int, default=200, help="Viewer --ingest-cap")
+    hp.add_argument("--frame-budget-ms", type=float, default=4.0, help="Viewer --frame-budget-ms")
+    hp.add_argument("--font", help="Optional path to TTF font to use")
+    hp.add_argument("--out", help="Write the JSON report here instead of stdout")
+    hp.set_defaults(func=cmd_harness)
+    return ap.parse_args()
+
+def main():
+    args = parse_args()
+    raise SystemExit(args.func(args))
+
+if __name__ == "__main__":
+    main()